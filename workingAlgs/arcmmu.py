@@ -0,0 +1,202 @@
+from mmu import MAX_SAMPLES, MMU, NO_PAGE, thin_samples
+from array import array
+from framepool import FreeFramePool
+from collections import OrderedDict
+
+"""Adaptive Replacement Cache (Megiddo and Modha).
+Resident pages live in two LRU lists:
+    T1: pages seen once recently
+    T2: pages seen at least twice recently
+and two ghost lists remember the pages recently evicted from each of them:
+    B1: evicted from T1
+    B2: evicted from T2
+A fault on a B1 ghost means T1 was too small, so the target size p of T1
+grows; a fault on a B2 ghost shrinks it. Scans only pass through T1, so the
+hot pages in T2 survive them. Every list is an OrderedDict (least recently
+used first), so all operations are O(1).
+"""
+class ArcMMU(MMU):
+    __slots__ = ("frames", "debug", "frame_table", "free_frames", "table", "dirty_pages",
+                 "t1", "t2", "b1", "b2", "p", "sample_interval", "p_history",
+                 "access_counter", "page_faults", "disk_reads", "disk_writes",
+                 "disk_accesses")
+
+    def __init__(self, frames, debug=False, sample_interval=1000):
+        self.frames = frames
+        self.debug = debug
+
+        # frame -> page mapping
+        self.frame_table = array('q', [NO_PAGE]) * frames
+        self.free_frames = FreeFramePool(frames)
+
+        # page -> frame mapping
+        self.table = {}
+
+        # set of pages currently marked dirty
+        self.dirty_pages = set()
+
+        # resident lists and ghost lists, least recently used first
+        self.t1 = OrderedDict()
+        self.t2 = OrderedDict()
+        self.b1 = OrderedDict()
+        self.b2 = OrderedDict()
+
+        # target size of T1, and samples of it as (access, p); the interval
+        # doubles whenever MAX_SAMPLES samples have been taken
+        self.p = 0
+        self.sample_interval = sample_interval
+        self.p_history = []
+        self.access_counter = 0
+
+        # stats
+        self.page_faults = 0
+        self.disk_reads = 0
+        self.disk_writes = 0
+        self.disk_accesses = 0
+
+    def set_debug(self):
+        self.debug = True
+
+    def reset_debug(self):
+        self.debug = False
+
+    def get_frame(self, page_number):
+        return self.table.get(page_number)
+
+    def _evict(self, resident, ghost):
+        """Move the LRU page of a resident list to a ghost list and return its frame."""
+        victim_page, _ = resident.popitem(last=False)
+        if ghost is not None:
+            ghost[victim_page] = None
+        victim_frame = self.table.pop(victim_page)
+
+        if self.debug:
+            print(f"Evicting page {victim_page} from frame {victim_frame}")
+
+        # Write back if dirty
+        if victim_page in self.dirty_pages:
+            self.disk_writes += 1
+            self.dirty_pages.remove(victim_page)
+            if self.debug:
+                print(f"Writing dirty page {victim_page} to disk (disk_writes={self.disk_writes})")
+
+        self.frame_table[victim_frame] = NO_PAGE
+        return victim_frame
+
+    def _replace(self, in_b2):
+        """ARC REPLACE: evict from T1 or T2 depending on the target p."""
+        t1_size = len(self.t1)
+        if t1_size and (t1_size > self.p or (in_b2 and t1_size == self.p)):
+            return self._evict(self.t1, self.b1)
+        return self._evict(self.t2, self.b2)
+
+    def _allocate_frame_for(self, in_b2):
+        frame = self.free_frames.allocate()
+        if frame is not None:
+            return frame
+        return self._replace(in_b2)
+
+    def _access(self, page_number):
+        """Update the ARC lists for one access. Returns True on a page fault."""
+        self.access_counter += 1
+        if self.access_counter % self.sample_interval == 0:
+            self.p_history.append((self.access_counter, self.p))
+            if len(self.p_history) == MAX_SAMPLES:
+                self.p_history, self.sample_interval = thin_samples(self.p_history,
+                                                                    self.sample_interval)
+
+        # Case I: hit in T1 or T2 -> most recently used end of T2
+        if page_number in self.t1:
+            del self.t1[page_number]
+            self.t2[page_number] = None
+            return False
+        if page_number in self.t2:
+            self.t2.move_to_end(page_number)
+            return False
+
+        frames = self.frames
+        if page_number in self.b1:
+            # Case II: T1 was too small, grow its target
+            self.p = min(frames, self.p + max(len(self.b2) // len(self.b1), 1))
+            frame = self._allocate_frame_for(False)
+            del self.b1[page_number]
+            self.t2[page_number] = None
+        elif page_number in self.b2:
+            # Case III: T2 was too small, shrink the target of T1
+            self.p = max(0, self.p - max(len(self.b1) // len(self.b2), 1))
+            frame = self._allocate_frame_for(True)
+            del self.b2[page_number]
+            self.t2[page_number] = None
+        else:
+            # Case IV: page not seen recently
+            l1_size = len(self.t1) + len(self.b1)
+            if l1_size == frames:
+                if len(self.t1) < frames:
+                    self.b1.popitem(last=False)
+                    frame = self._allocate_frame_for(False)
+                else:
+                    # B1 is empty: drop the LRU page of T1 without a ghost
+                    frame = self._evict(self.t1, None)
+            else:
+                total = l1_size + len(self.t2) + len(self.b2)
+                if total >= 2 * frames:
+                    self.b2.popitem(last=False)
+                frame = self._allocate_frame_for(False)
+            self.t1[page_number] = None
+
+        self.page_faults += 1
+        self.disk_reads += 1
+        self.frame_table[frame] = page_number
+        self.table[page_number] = frame
+        return True
+
+    def read_memory(self, page_number):
+        fault = self._access(page_number)
+        if self.debug:
+            if fault:
+                print(f"Read miss: loading page {page_number} into frame {self.table[page_number]} (disk_reads={self.disk_reads})")
+            else:
+                print(f"Read hit: page {page_number} in frame {self.table[page_number]}")
+            print("="*50 + "\n")
+        return fault
+
+    def write_memory(self, page_number):
+        fault = self._access(page_number)
+        self.dirty_pages.add(page_number)
+        if self.debug:
+            if fault:
+                print(f"Write miss: loading page {page_number} into frame {self.table[page_number]} (disk_reads={self.disk_reads})")
+            else:
+                print(f"Write hit: marked page {page_number} dirty in frame {self.table[page_number]}")
+            print("="*50 + "\n")
+        return fault
+
+    def get_total_disk_reads(self):
+        return self.disk_reads
+
+    def get_total_disk_writes(self):
+        return self.disk_writes
+
+    def get_total_page_faults(self):
+        return self.page_faults
+
+    def get_disk_accesses(self):
+        return self.disk_accesses
+
+    def get_report(self):
+        lines = [f"arc target T1 size p: {self.p} (T1={len(self.t1)}, T2={len(self.t2)}, "
+                 f"B1={len(self.b1)}, B2={len(self.b2)})"]
+        if self.p_history:
+            samples = " ".join(f"{access}:{p}" for access, p in self.p_history)
+            lines.append(f"arc p every {self.sample_interval} accesses: {samples}")
+        return lines
+
+    def print_page_table(self):
+        if not self.debug:
+            return
+        table = ['-'] * self.frames
+        for i, page in enumerate(self.frame_table):
+            if page != NO_PAGE:
+                table[i] = str(page)
+        print("Page Table:", " ".join(table))
+        print("-" * 40)
@@ -0,0 +1,44 @@
+import unittest
+import random
+from arcmmu import ArcMMU
+from mmu import MAX_SAMPLES
+from lrummu import LruMMU
+
+
+class TestArcMMU(unittest.TestCase):
+    def test_list_sizes_stay_bounded(self):
+        rng = random.Random(7)
+        frames = 5
+        mmu = ArcMMU(frames, sample_interval=10)
+        for _ in range(5000):
+            page = rng.randrange(30)
+            if rng.random() < 0.3:
+                mmu.write_memory(page)
+            else:
+                mmu.read_memory(page)
+            self.assertLessEqual(len(mmu.t1) + len(mmu.t2), frames)
+            self.assertLessEqual(len(mmu.t1) + len(mmu.b1), frames)
+            self.assertLessEqual(len(mmu.t1) + len(mmu.t2) + len(mmu.b1) + len(mmu.b2), 2 * frames)
+            self.assertLessEqual(0, mmu.p)
+            self.assertLessEqual(mmu.p, frames)
+        self.assertEqual(len(mmu.table), len(mmu.t1) + len(mmu.t2))
+        # 500 samples every 10 accesses were thinned to every 80 accesses
+        self.assertLess(len(mmu.p_history), MAX_SAMPLES)
+        self.assertEqual(mmu.sample_interval, 80)
+        self.assertEqual([access for access, _ in mmu.p_history],
+                         list(range(80, 5001, 80)))
+
+    def test_hot_pages_survive_a_scan(self):
+        hot = [1, 2, 3]
+        accesses = hot * 3 + list(range(100, 120)) + hot
+        arc = ArcMMU(4)
+        lru = LruMMU(4)
+        for page in accesses:
+            arc.read_memory(page)
+            lru.read_memory(page)
+        self.assertEqual(arc.get_total_page_faults(), 3 + 20)
+        self.assertEqual(lru.get_total_page_faults(), 3 + 20 + 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+'''
+* Command line option parsing shared by memsim, shards and montecarlo.
+* Options are "--name value" pairs anywhere in a list of arguments. A
+* missing or bad value raises ValueError with a message for the user, so
+* each tool reports it the same way as its other errors.
+*
+'''
+
+
+def get_option(options, name, default=None):
+    """Return the value after an optional --name argument, or default."""
+    if name not in options:
+        return default
+    index = options.index(name)
+    if index + 1 >= len(options):
+        raise ValueError(f"{name} needs a value")
+    return options[index + 1]
+
+
+def find_option(options, names):
+    """Return the first of names given in options, or None."""
+    for name in names:
+        if name in options:
+            return name
+    return None
+
+
+def to_int(value, name, minimum=None):
+    """Convert the value given for name to an int of at least minimum."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"Invalid value '{value}' for {name}. It must be an integer")
+    if minimum is not None and number < minimum:
+        raise ValueError(f"{name} must be at least {minimum}")
+    return number
+
+
+def to_float(value, name):
+    """Convert the value given for name to a float."""
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"Invalid value '{value}' for {name}. It must be a number")
+
+
+def get_int_option(options, name, default=None, minimum=None):
+    """Like get_option, for an integer value."""
+    value = get_option(options, name)
+    return default if value is None else to_int(value, name, minimum)
+
+
+def get_float_option(options, name, default=None):
+    """Like get_option, for a numeric value."""
+    value = get_option(options, name)
+    return default if value is None else to_float(value, name)
@@ -0,0 +1,32 @@
+import unittest
+from cli import find_option, get_float_option, get_int_option, get_option
+
+
+class TestCli(unittest.TestCase):
+    def test_get_option(self):
+        options = ["--disk", "ssd", "--dense"]
+        self.assertEqual(get_option(options, "--disk"), "ssd")
+        self.assertEqual(get_option(options, "--seed", "none"), "none")
+        with self.assertRaisesRegex(ValueError, "--dense needs a value"):
+            get_option(options, "--dense")
+
+    def test_numeric_options(self):
+        options = ["--jobs", "4", "--rate", "0.5", "--seed", "x"]
+        self.assertEqual(get_int_option(options, "--jobs", minimum=1), 4)
+        self.assertEqual(get_int_option(options, "--runs", 10), 10)
+        self.assertEqual(get_float_option(options, "--rate"), 0.5)
+        with self.assertRaisesRegex(ValueError, "Invalid value 'x' for --seed"):
+            get_int_option(options, "--seed")
+        with self.assertRaisesRegex(ValueError, "--jobs must be at least 8"):
+            get_int_option(options, "--jobs", minimum=8)
+        with self.assertRaisesRegex(ValueError, "It must be a number"):
+            get_float_option(options, "--seed")
+
+    def test_find_option(self):
+        self.assertEqual(find_option(["--seed", "1", "--disk", "ssd"], ("--dense", "--disk")),
+                         "--disk")
+        self.assertIsNone(find_option(["--seed", "1"], ("--dense", "--disk")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,28 +1,32 @@
-from mmu import MMU
+from mmu import MMU, NO_PAGE
+from framepool import FreeFramePool
+from pagetable import PageTableMixin
+from tracefile import open_trace
+from array import array
 
 """Use bit: was it recently accessed? set bit to 1 if yes. 
 'circular list/clock': hand moves around until it finds a victim
 if use bit = 0, evict that page
 """
-class ClockMMU(MMU):
-    def __init__(self, frames, debug=False):
+class ClockMMU(PageTableMixin, MMU):
+    __slots__ = ("frames", "debug", "clock_hand", "use_bits", "frame_table", "free_frames",
+                 "dirty_bits", "page_faults", "disk_reads", "disk_writes", "disk_accesses")
+
+    def __init__(self, frames, debug=False, interner=None):
         self.frames = frames
         self.debug = debug
-        self.clock_hand = 0            # start the clock at frame 0
-        self.use_bits = [0] * frames   # track use/reference bits per frame
-
-        # frame -> page mapping
-        self.frame_table = [None] * frames
+        self.clock_hand = 0                 # start the clock at frame 0
+        self.use_bits = bytearray(frames)   # track use/reference bits per frame
 
-        # page -> frame mapping
-        self.table = {}
+        # frame -> page mapping (NO_PAGE when empty)
+        self.frame_table = array('q', [NO_PAGE]) * frames
+        self.free_frames = FreeFramePool(frames)
 
-        # set of pages currently marked dirty
-        self.dirty_pages = set()
+        # page -> frame mapping (see PageTableMixin)
+        self._init_page_table(interner)
 
-        # track  recently used
-        self.last_used = {}  
-        self.access_counter = 0
+        # dirty bit per frame
+        self.dirty_bits = bytearray(frames)
 
         # stats
         self.page_faults = 0
@@ -44,73 +48,67 @@ class ClockMMU(MMU):
         self.frame_table[frame] = page_number
 
     def is_frame_empty(self, frame):
-        return self.frame_table[frame] is None
+        return self.frame_table[frame] == NO_PAGE
 
     def get_frame_content(self, frame):
-        return self.frame_table[frame]
+        page_number = self.frame_table[frame]
+        return None if page_number == NO_PAGE else page_number
 
     def set_frame_content(self, frame, content):
         old = self.frame_table[frame]
-        if old is not None and old in self.table:
+        if old != NO_PAGE and old in self.table:
             del self.table[old]
-        self.frame_table[frame] = content
+        self.frame_table[frame] = NO_PAGE if content is None else content
         if content is not None:
             self.table[content] = frame
     
     def _allocate_frame_for(self, page_number):
         # 1. Check for a free frame first
-        for idx, occupant in enumerate(self.frame_table):
-            if occupant is None:
-                self.use_bits[idx] = 1   # first access sets use bit
-                return idx
+        frame = self.free_frames.allocate()
+        if frame is not None:
+            self.use_bits[frame] = 1   # first access sets use bit
+            return frame
         
 
-        # 2. No free frame: apply Clock replacement
-        while True:
-            frame = self.clock_hand
-            occupant = self.frame_table[frame]
-
-            if self.use_bits[frame] == 0:
-                # Evict this page
-                if self.debug:
-                    print(f"Evicting page {occupant} from frame {frame}")
-
-                # Write back if dirty
-                if occupant in self.dirty_pages:
-                    self.disk_writes += 1
-                    self.dirty_pages.remove(occupant)
-                    if self.debug:
-                        print(f"Writing dirty page {occupant} to disk (disk_writes={self.disk_writes})")
-
-                # Remove old page mapping
-                if occupant in self.table:
-                    del self.table[occupant]
-
-                # Install new page
-                self.frame_table[frame] = None
-                self.use_bits[frame] = 0
+        # 2. No free frame: apply Clock replacement, giving every frame
+        # with its use bit set a second chance
+        use_bits = self.use_bits
+        hand = self.clock_hand
+        while use_bits[hand]:
+            use_bits[hand] = 0
+            hand += 1
+            if hand == self.frames:
+                hand = 0
+        frame = hand
+        occupant = self.frame_table[frame]
+
+        # Evict this page
+        if self.debug:
+            print(f"Evicting page {self.page_label(occupant)} from frame {frame}")
 
-                # Advance clock hand for next replacement
-                self.clock_hand = (self.clock_hand + 1) % self.frames
-                return frame
+        # Write back if dirty
+        if self.dirty_bits[frame]:
+            self.disk_writes += 1
+            self.dirty_bits[frame] = 0
+            if self.debug:
+                print(f"Writing dirty page {self.page_label(occupant)} to disk (disk_writes={self.disk_writes})")
 
-            else:
-                # Give a second chance
-                self.use_bits[frame] = 0
-                self.clock_hand = (self.clock_hand + 1) % self.frames
+        # Remove old page mapping
+        del self.table[occupant]
+        self.frame_table[frame] = NO_PAGE
 
+        # Advance clock hand for next replacement
+        self.clock_hand = (hand + 1) % self.frames
+        return frame
 
     def read_memory(self, page_number):
-        """Simulate a read access. Increment counter once per call."""
-        self.access_counter += 1  # only once per step
-
-        if page_number in self.table:  # HIT
+        """Simulate a read access."""
+        frame = self.table.get(page_number)
+        if frame is not None:  # HIT
             if self.debug:
                 
-                print(f"Read hit: page {page_number} in frame {self.table[page_number]}")
+                print(f"Read hit: page {self.page_label(page_number)} in frame {frame}")
                 print("="*50 + "\n")
-            self.last_used[page_number] = self.access_counter  # update LRU
-            frame = self.table[page_number]
             self.use_bits[frame] = 1  # mark as recently used
             return False
 
@@ -122,26 +120,22 @@ class ClockMMU(MMU):
         # install mapping
         self.frame_table[frame] = page_number
         self.table[page_number] = frame
-        self.last_used[page_number] = self.access_counter  # update LRU after allocation
         self.use_bits[frame] = 1
 
         if self.debug:
-            print(f"Read miss: loading page {page_number} into frame {frame} (disk_reads={self.disk_reads})")
+            print(f"Read miss: loading page {self.page_label(page_number)} into frame {frame} (disk_reads={self.disk_reads})")
             print("="*50 + "\n")
 
         return True
 
     def write_memory(self, page_number):
-        """Simulate a write access. Increment counter once per call."""
-        self.access_counter += 1  # only once per step
-
-        if page_number in self.table:  # HIT
-            self.dirty_pages.add(page_number)
-            self.last_used[page_number] = self.access_counter  # update LRU
-            frame = self.table[page_number]
+        """Simulate a write access."""
+        frame = self.table.get(page_number)
+        if frame is not None:  # HIT
+            self.dirty_bits[frame] = 1
             self.use_bits[frame] = 1  # mark as recently used
             if self.debug:
-                print(f"Write hit: marked page {page_number} dirty in frame {self.table[page_number]}")
+                print(f"Write hit: marked page {self.page_label(page_number)} dirty in frame {frame}")
                 print("="*50 + "\n")
             return False
 
@@ -153,16 +147,57 @@ class ClockMMU(MMU):
         # install mapping and mark dirty
         self.frame_table[frame] = page_number
         self.table[page_number] = frame
-        self.dirty_pages.add(page_number)
-        self.last_used[page_number] = self.access_counter  # update LRU after allocation
+        self.dirty_bits[frame] = 1
         self.use_bits[frame] = 1
 
         if self.debug:
-            print(f"Write miss: loading page {page_number} into frame {frame} (disk_reads={self.disk_reads})")
+            print(f"Write miss: loading page {self.page_label(page_number)} into frame {frame} (disk_reads={self.disk_reads})")
             print("="*50 + "\n")
 
         return True
 
+    def access_batch(self, pages, is_write, fault_bitmap=None):
+        """Simulate a batch of accesses (see MMU.access_batch)."""
+        if self.debug:
+            return MMU.access_batch(self, pages, is_write, fault_bitmap)
+
+        # local names keep attribute lookups out of the loop
+        table, lookup, _ = self._batch_table()
+        frame_table = self.frame_table
+        use_bits = self.use_bits
+        dirty_bits = self.dirty_bits
+        allocate = self._allocate_frame_for
+        faults = 0
+        for i, page_number in enumerate(pages):
+            frame = lookup(page_number)
+            if frame is None:
+                # PAGE FAULT
+                faults += 1
+                if fault_bitmap is not None:
+                    fault_bitmap[i >> 3] |= 1 << (i & 7)
+                frame = allocate(page_number)
+                frame_table[frame] = page_number
+                table[page_number] = frame
+            use_bits[frame] = 1
+            if is_write[i]:
+                dirty_bits[frame] = 1
+
+        self.page_faults += faults
+        self.disk_reads += faults
+        self.disk_accesses += len(pages)
+        return faults
+
+    def access_runs(self, pages, counts, any_write):
+        """Simulate a batch of collapsed runs (see MMU.access_runs).
+
+        Repeated hits only set the use bit again, so a run is one access.
+        """
+        if self.debug:
+            return MMU.access_runs(self, pages, counts, any_write)
+        faults = self.access_batch(pages, any_write)
+        self.disk_accesses += sum(counts) - len(pages)
+        return faults
+
     def get_total_disk_reads(self):
         return self.disk_reads
 
@@ -180,8 +215,8 @@ class ClockMMU(MMU):
             return
         table = ['-'] * self.frames
         for i, page in enumerate(self.frame_table):
-            if page is not None:
-                table[i] = str(page)
+            if page != NO_PAGE:
+                table[i] = str(self.page_label(page))
         print("Page Table:", " ".join(table))
         print("-" * 40)
 
@@ -196,7 +231,7 @@ class ClockMMU(MMU):
             print(f"Running trace from {filename}")
             print("="*50 + "\n")
 
-        with open(filename, 'r') as f:
+        with open_trace(filename, text=True) as f:
             step_num = 1
             for line in f:
                 line = line.strip()
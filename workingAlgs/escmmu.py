@@ -0,0 +1,77 @@
+from clockmmu import ClockMMU
+from mmu import NO_PAGE
+
+"""Enhanced second chance: like clock, but the victim is chosen by
+(use bit, dirty bit) class so clean pages are preferred over dirty ones:
+    (0, 0) not used, clean     -> best victim
+    (0, 1) not used, dirty     -> needs a write back
+    (1, 0) used, clean
+    (1, 1) used, dirty         -> worst victim
+The hand makes at most four sweeps: look for (0,0), then look for (0,1)
+while clearing use bits, then repeat both. The fourth sweep always finds a
+victim because every use bit is clear by then.
+"""
+class EscMMU(ClockMMU):
+    MAX_SWEEPS = 4
+
+    __slots__ = ("sweeps", "evictions")
+
+    def __init__(self, frames, debug=False, interner=None):
+        super().__init__(frames, debug, interner)
+        self.sweeps = 0     # total sweeps made by the hand, for reporting
+        self.evictions = 0
+
+    def _find_victim(self):
+        """Return the frame to evict, moving the clock hand past it."""
+        use_bits = self.use_bits
+        dirty_bits = self.dirty_bits
+        frames = self.frames
+        hand = self.clock_hand
+        self.evictions += 1
+        for sweep in range(self.MAX_SWEEPS):
+            self.sweeps += 1
+            want_dirty = sweep % 2     # 1 on the clearing sweeps
+            for _ in range(frames):
+                frame = hand
+                hand += 1
+                if hand == frames:
+                    hand = 0
+                if use_bits[frame] == 0 and dirty_bits[frame] == want_dirty:
+                    self.clock_hand = hand
+                    return frame
+                if want_dirty:
+                    # second chance: clear the use bit as the hand passes
+                    use_bits[frame] = 0
+        # unreachable: after two clearing sweeps every frame is (0, x)
+        raise RuntimeError("enhanced second chance found no victim")
+
+    def get_report(self):
+        per_eviction = self.sweeps / self.evictions if self.evictions else 0.0
+        return [f"esc sweeps: {self.sweeps}, sweeps per eviction: {per_eviction:.2f}"]
+
+    def _allocate_frame_for(self, page_number):
+        # 1. Check for a free frame first
+        frame = self.free_frames.allocate()
+        if frame is not None:
+            self.use_bits[frame] = 1   # first access sets use bit
+            return frame
+
+        # 2. No free frame: pick the best (use, dirty) class
+        frame = self._find_victim()
+        occupant = self.frame_table[frame]
+
+        if self.debug:
+            print(f"Evicting page {self.page_label(occupant)} from frame {frame}")
+
+        # Write back if dirty
+        if self.dirty_bits[frame]:
+            self.disk_writes += 1
+            self.dirty_bits[frame] = 0
+            if self.debug:
+                print(f"Writing dirty page {self.page_label(occupant)} to disk (disk_writes={self.disk_writes})")
+
+        # Remove old page mapping
+        del self.table[occupant]
+        self.frame_table[frame] = NO_PAGE
+        self.use_bits[frame] = 0
+        return frame
@@ -0,0 +1,38 @@
+import unittest
+from clockmmu import ClockMMU
+from escmmu import EscMMU
+
+
+class TestEscMMU(unittest.TestCase):
+    def run_both(self, accesses, frames):
+        esc = EscMMU(frames)
+        clock = ClockMMU(frames)
+        for page, rw in accesses:
+            for mmu in (esc, clock):
+                if rw == "W":
+                    mmu.write_memory(page)
+                else:
+                    mmu.read_memory(page)
+        return esc, clock
+
+    def test_prefers_clean_victim(self):
+        # page 1 is dirty, page 2 is clean; both lose their use bit on the
+        # first sweep, so plain clock evicts 1 but esc evicts 2
+        esc, clock = self.run_both([(1, "W"), (2, "R"), (3, "R")], 2)
+        self.assertIsNotNone(esc.get_frame(1))
+        self.assertIsNone(esc.get_frame(2))
+        self.assertEqual(esc.get_total_disk_writes(), 0)
+        self.assertEqual(clock.get_total_disk_writes(), 1)
+
+    def test_evicts_dirty_page_when_all_dirty(self):
+        esc, _ = self.run_both([(1, "W"), (2, "W"), (3, "W"), (4, "R")], 3)
+        self.assertEqual(esc.get_total_page_faults(), 4)
+        self.assertEqual(esc.get_total_disk_writes(), 1)
+        self.assertLessEqual(esc.sweeps, EscMMU.MAX_SWEEPS)
+        self.assertEqual(esc.evictions, 1)
+        self.assertEqual(esc.get_report(),
+                         [f"esc sweeps: {esc.sweeps}, sweeps per eviction: {esc.sweeps:.2f}"])
+
+
+if __name__ == '__main__':
+    unittest.main()
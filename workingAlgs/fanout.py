@@ -0,0 +1,92 @@
+from optmmu import build_next_use
+from policies import POLICIES, create_mmu
+from sweep import load_trace, parse_frame_range
+from tracefile import collapse_runs, iter_trace_blocks
+
+"""Fan-out: one pass over a trace feeds several MMUs, any mix of policies
+and frame counts, so the trace is read and decoded once for the whole
+comparison.
+
+Each decoded block is cut into chunks of CHUNK_EVENTS accesses and every
+MMU runs the same chunk with access_batch before the next chunk is taken,
+so the chunk is still in the CPU cache when the later MMUs read it.
+"""
+
+CHUNK_EVENTS = 1 << 14      # 128 KB of page numbers
+
+
+def parse_frame_list(text):
+    """Turn '4,8,16' or a frame range (see parse_frame_range) into a list."""
+    if ":" in text:
+        return parse_frame_range(text)
+    try:
+        frame_counts = [int(part) for part in text.split(",")]
+    except ValueError:
+        raise ValueError(f"Invalid frame list '{text}'. Use a,b,c or first:last[:step]")
+    if min(frame_counts) < 1:
+        raise ValueError("Frame number must be at least 1")
+    return frame_counts
+
+
+def parse_mode_list(text):
+    """Turn 'lru,clock' into a list of replacement modes."""
+    modes = text.split(",")
+    for mode in modes:
+        if mode not in POLICIES:
+            raise ValueError(f"Invalid replacement mode '{mode}'. "
+                             f"Valid options are [{', '.join(POLICIES)}]")
+    return modes
+
+
+def run_fanout(filename, configs, collapse=False, chunk_events=CHUNK_EVENTS, seed=None):
+    """Run every (replacement_mode, frames) in configs over one pass of a trace.
+
+    With collapse, runs of accesses to one page are collapsed once per
+    block and applied with access_runs. seed seeds every rand MMU (see
+    create_mmu). Returns (events, mmus) with the MMUs in the order of configs.
+    """
+    next_use = None
+    if any(mode == "opt" for mode, _ in configs):
+        # opt needs the whole trace up front, so decode it once and reuse it
+        pages, writes = load_trace(filename)
+        next_use = build_next_use(pages)
+        blocks = [(pages, writes)]
+    else:
+        blocks = iter_trace_blocks(filename)
+    mmus = [create_mmu(mode, frames, next_use, seed=seed) for mode, frames in configs]
+
+    events = 0
+    for pages, writes in blocks:
+        events += len(pages)
+        if collapse:
+            pages, counts, writes = collapse_runs(pages, writes)
+            counts = memoryview(counts)
+        pages = memoryview(pages)
+        writes = memoryview(writes)
+        for start in range(0, len(pages), chunk_events):
+            end = start + chunk_events
+            chunk_pages = pages[start:end]
+            chunk_writes = writes[start:end]
+            if collapse:
+                chunk_counts = counts[start:end]
+                for mmu in mmus:
+                    mmu.access_runs(chunk_pages, chunk_counts, chunk_writes)
+            else:
+                for mmu in mmus:
+                    mmu.access_batch(chunk_pages, chunk_writes)
+    return events, mmus
+
+
+def print_fanout(events, configs, mmus):
+    print(f"events in trace: {events}")
+    # the policy column is as wide as the longest mode name
+    width = max([8] + [len(mode) for mode, _ in configs])
+    print(f"{'policy':>{width}} {'frames':>8} {'disk reads':>12} {'disk writes':>12} "
+          f"{'fault rate':>11}")
+    for (mode, frames), mmu in zip(configs, mmus):
+        rate = mmu.get_total_page_faults() / events if events > 0 else 0.0
+        print(f"{mode:>{width}} {frames:>8} {mmu.get_total_disk_reads():>12} "
+              f"{mmu.get_total_disk_writes():>12} {rate:>11.4f}")
+    for (mode, frames), mmu in zip(configs, mmus):
+        for line in mmu.get_report():
+            print(f"{mode} {frames}: {line}")
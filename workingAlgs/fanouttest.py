@@ -0,0 +1,34 @@
+import unittest
+from fanout import parse_frame_list, parse_mode_list, run_fanout
+from optmmu import build_next_use
+from sweep import load_trace, simulate
+
+
+class TestFanout(unittest.TestCase):
+    def test_parse_lists(self):
+        self.assertEqual(parse_frame_list("4,8,16"), [4, 8, 16])
+        self.assertEqual(parse_frame_list("2:6:2"), [2, 4, 6])
+        self.assertEqual(parse_mode_list("lru,clock"), ["lru", "clock"])
+        for bad in ("4,x", "0,4"):
+            with self.assertRaises(ValueError):
+                parse_frame_list(bad)
+        with self.assertRaises(ValueError):
+            parse_mode_list("lru,foo")
+
+    def test_matches_separate_runs(self):
+        pages, writes = load_trace("trace3")
+        next_use = build_next_use(pages)
+        configs = [(mode, frames) for mode in ("lru", "clock", "esc", "opt", "lirs")
+                   for frames in (1, 4, 8)]
+        for collapse in (False, True):
+            events, mmus = run_fanout("trace3", configs, collapse, chunk_events=16)
+            self.assertEqual(events, len(pages))
+            for (mode, frames), mmu in zip(configs, mmus):
+                expected = simulate(mode, frames, pages, writes, next_use)
+                got = (frames, mmu.get_total_disk_reads(), mmu.get_total_disk_writes(),
+                       mmu.get_total_page_faults())
+                self.assertEqual(got, expected, (mode, frames, collapse))
+
+
+if __name__ == '__main__':
+    unittest.main()
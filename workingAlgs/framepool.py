@@ -0,0 +1,37 @@
+'''
+* Free frame pool shared by the MMUs.
+* Frames are handed out lowest index first until every frame has been used
+* once; after that only frames given back with release() can be allocated.
+* Both allocate() and release() are O(1), and once memory is full and
+* nothing has been released, allocate() returns None straight away so a
+* page fault can go directly to the replacement policy.
+*
+'''
+class FreeFramePool:
+    __slots__ = ("frames", "next_unused", "released")
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.next_unused = 0    # frames [next_unused, frames) were never used
+        self.released = []      # frames given back after being used
+
+    def allocate(self):
+        """Return a free frame, or None when memory is full."""
+        if self.released:
+            return self.released.pop()
+        if self.next_unused < self.frames:
+            frame = self.next_unused
+            self.next_unused += 1
+            return frame
+        return None
+
+    def release(self, frame):
+        """Give a frame back to the pool so it can be allocated again."""
+        self.released.append(frame)
+
+    def is_full(self):
+        """True when every frame is in use."""
+        return not self.released and self.next_unused >= self.frames
+
+    def free_count(self):
+        return len(self.released) + self.frames - self.next_unused
@@ -0,0 +1,163 @@
+from collections import Counter
+import heapq
+
+"""Storage latency model: turns the disk reads and writes of a simulation
+into the time spent waiting for them.
+
+A profile gives the service time of one 4 KB read and one 4 KB write in
+microseconds; PROFILES holds nominal random I/O figures for a hard disk,
+a SATA SSD and an NVMe SSD, and LatencyModel takes any other pair. Every
+memory access costs MEMORY_NS on top of that.
+
+The model is fed in chunks: record(events, reads, writes) says that
+`events` memory accesses caused `reads` page reads and `writes` dirty
+write-backs (see access_timed). Within a chunk the faults are spread
+evenly over the accesses and the write-backs over the faults.
+
+Without a queue depth the disk does one request at a time and the process
+waits for all of it: a fault costs the write-back of its victim (if any)
+plus the read. With a queue depth Q the disk serves up to Q requests at
+once; write-backs are queued without waiting, and a fault waits for its
+read, including any time spent queued behind earlier requests.
+
+Fault latencies go into a histogram with power of two buckets (in us).
+"""
+
+MEMORY_NS = 100             # one memory access
+LATENCY_CHUNK = 1024        # accesses per record() call in access_timed
+
+# name -> (read us, write us)
+PROFILES = {
+    "hdd": (8000.0, 9000.0),
+    "ssd": (100.0, 250.0),
+    "nvme": (20.0, 40.0),
+}
+
+
+class LatencyModel:
+    def __init__(self, read_us, write_us, queue_depth=None, memory_ns=MEMORY_NS):
+        if read_us <= 0 or write_us <= 0:
+            raise ValueError("Read and write times must be positive")
+        if queue_depth is not None and queue_depth < 1:
+            raise ValueError("Queue depth must be at least 1")
+        self.read_us = read_us
+        self.write_us = write_us
+        self.queue_depth = queue_depth
+        self.memory_ns = memory_ns
+
+        # times (us) at which each of the queue_depth disk slots is free
+        self.free_at = [0.0] * (queue_depth or 1)
+        self.now = 0.0              # simulated time in us
+
+        # stats
+        self.events = 0
+        self.faults = 0
+        self.writes = 0
+        self.paging_us = 0.0        # time spent waiting for the disk
+        self.histogram = Counter()  # bucket -> faults
+
+    @classmethod
+    def from_profile(cls, name, queue_depth=None):
+        if name not in PROFILES:
+            raise ValueError(f"Invalid disk profile '{name}'. Valid options are [{', '.join(PROFILES)}]")
+        read_us, write_us = PROFILES[name]
+        return cls(read_us, write_us, queue_depth)
+
+    def _add_faults(self, count, latency):
+        if count:
+            self.histogram[int(latency).bit_length()] += count
+            self.paging_us += count * latency
+
+    def record(self, events, reads, writes):
+        """Account for `events` accesses that caused the given disk traffic."""
+        self.events += events
+        self.faults += reads
+        self.writes += writes
+        memory_us = events * self.memory_ns / 1000
+
+        if self.queue_depth is None:
+            # one request at a time: the faults with q or q + 1 write-backs
+            # ahead of their read all take the same time
+            self.now += memory_us
+            if reads == 0:
+                self.paging_us += writes * self.write_us
+                self.now += writes * self.write_us
+                return
+            per_fault, extra = divmod(writes, reads)
+            latency = self.read_us + per_fault * self.write_us
+            self._add_faults(reads - extra, latency)
+            self._add_faults(extra, latency + self.write_us)
+            self.now += reads * latency + extra * self.write_us
+            return
+
+        # local names keep attribute lookups out of the loop
+        free_at = self.free_at
+        queue = heapq.heapreplace
+        histogram = self.histogram
+        now = self.now
+        read_us = self.read_us
+        write_us = self.write_us
+        gap = memory_us / max(reads, 1)     # memory time between faults
+        waited = 0.0
+        issued = 0
+        for i in range(reads):
+            now += gap
+            # queue the write-backs due by this fault
+            due = (i + 1) * writes // reads
+            while issued < due:
+                queue(free_at, max(now, free_at[0]) + write_us)
+                issued += 1
+            done = max(now, free_at[0]) + read_us
+            queue(free_at, done)
+            histogram[int(done - now).bit_length()] += 1
+            waited += done - now
+            now = done
+        if reads == 0:
+            now += memory_us
+        while issued < writes:
+            queue(free_at, max(now, free_at[0]) + write_us)
+            issued += 1
+        self.paging_us += waited
+        self.now = now
+
+    def effective_access_ns(self):
+        """Mean time per memory access, paging included."""
+        if self.events == 0:
+            return 0.0
+        return self.memory_ns + self.paging_us * 1000 / self.events
+
+    def get_report(self):
+        depth = "none" if self.queue_depth is None else self.queue_depth
+        lines = [
+            f"disk model: read {self.read_us:g} us, write {self.write_us:g} us, queue depth {depth}",
+            f"simulated paging time: {self.paging_us / 1e6:.6f} s",
+            f"effective access time: {self.effective_access_ns():.1f} ns",
+        ]
+        if self.faults:
+            lines.append("fault latency (us):")
+            for bucket in sorted(self.histogram):
+                low = 0 if bucket == 0 else 1 << (bucket - 1)
+                count = self.histogram[bucket]
+                label = f"{low}-{1 << bucket}"
+                lines.append(f"{label:>16} {count:>12} {100 * count / self.faults:>6.2f}%")
+        return lines
+
+
+def access_timed(mmu, model, pages, writes, counts=None):
+    """Run a block through mmu in LATENCY_CHUNK pieces and feed model the
+    disk traffic of each piece.
+
+    With counts the block holds collapsed runs (see MMU.access_runs).
+    """
+    for start in range(0, len(pages), LATENCY_CHUNK):
+        end = start + LATENCY_CHUNK
+        accesses = mmu.get_disk_accesses()
+        reads = mmu.get_total_disk_reads()
+        disk_writes = mmu.get_total_disk_writes()
+        if counts is None:
+            mmu.access_batch(pages[start:end], writes[start:end])
+        else:
+            mmu.access_runs(pages[start:end], counts[start:end], writes[start:end])
+        model.record(mmu.get_disk_accesses() - accesses,
+                     mmu.get_total_disk_reads() - reads,
+                     mmu.get_total_disk_writes() - disk_writes)
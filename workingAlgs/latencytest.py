@@ -0,0 +1,53 @@
+import unittest
+from latency import LatencyModel, access_timed
+from lrummu import LruMMU
+from sweep import load_trace
+
+
+class TestLatencyModel(unittest.TestCase):
+    def test_serial_disk(self):
+        model = LatencyModel(100.0, 300.0)
+        # 4 faults, 1 of them writing back its victim
+        model.record(1000, 4, 1)
+        self.assertEqual(model.paging_us, 4 * 100 + 300)
+        self.assertEqual(model.histogram, {7: 3, 9: 1})
+        self.assertAlmostEqual(model.effective_access_ns(), 100 + 700 * 1000 / 1000)
+
+    def test_queue_depth_one_waits_like_serial(self):
+        serial = LatencyModel(100.0, 300.0)
+        queued = LatencyModel(100.0, 300.0, queue_depth=1)
+        for events, reads, writes in ((1000, 4, 1), (50, 0, 0), (10, 7, 7), (10, 3, 2)):
+            serial.record(events, reads, writes)
+            queued.record(events, reads, writes)
+        self.assertAlmostEqual(queued.paging_us, serial.paging_us)
+        self.assertEqual(queued.histogram, serial.histogram)
+
+    def test_deeper_queue_hides_write_backs(self):
+        shallow = LatencyModel(100.0, 300.0, queue_depth=1)
+        deep = LatencyModel(100.0, 300.0, queue_depth=8)
+        for model in (shallow, deep):
+            model.record(100, 50, 50)
+        self.assertLess(deep.paging_us, shallow.paging_us)
+        self.assertGreaterEqual(deep.paging_us, 50 * 100)
+
+    def test_access_timed_matches_access_batch(self):
+        pages, writes = load_trace("trace3")
+        plain = LruMMU(3)
+        plain.access_batch(pages, writes)
+        timed = LruMMU(3)
+        model = LatencyModel(100.0, 300.0)
+        access_timed(timed, model, pages, writes)
+        self.assertEqual(timed.get_total_page_faults(), plain.get_total_page_faults())
+        self.assertEqual(model.faults, plain.get_total_disk_reads())
+        self.assertEqual(model.writes, plain.get_total_disk_writes())
+        self.assertEqual(model.events, len(pages))
+
+    def test_bad_profile(self):
+        with self.assertRaises(ValueError):
+            LatencyModel.from_profile("tape")
+        with self.assertRaises(ValueError):
+            LatencyModel.from_profile("ssd", queue_depth=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
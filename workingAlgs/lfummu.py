@@ -0,0 +1,182 @@
+from mmu import MMU, NO_PAGE
+from array import array
+from framepool import FreeFramePool
+from collections import OrderedDict
+
+"""O(1) least frequently used replacement.
+Resident pages are grouped in frequency buckets: buckets[n] is an
+OrderedDict of the pages used n times, least recently used first, and
+min_count is the lowest non-empty bucket. A hit moves a page up one bucket
+and a fault evicts the least recently used page of the lowest bucket, so
+both are constant time. Ties between pages with the same count go to LRU.
+
+With aging_interval set, every aging_interval accesses all counts are
+halved (but kept at least 1), so pages that were hot a long time ago can
+leave memory. Aging touches every resident page, so it is amortized O(1)
+when the interval is at least the number of frames.
+"""
+class LfuMMU(MMU):
+    __slots__ = ("frames", "debug", "frame_table", "free_frames", "table", "dirty_pages",
+                 "counts", "buckets", "min_count", "aging_interval", "access_counter",
+                 "agings", "page_faults", "disk_reads", "disk_writes", "disk_accesses")
+
+    def __init__(self, frames, debug=False, aging_interval=None):
+        self.frames = frames
+        self.debug = debug
+
+        # frame -> page mapping
+        self.frame_table = array('q', [NO_PAGE]) * frames
+        self.free_frames = FreeFramePool(frames)
+
+        # page -> frame mapping
+        self.table = {}
+
+        # set of pages currently marked dirty
+        self.dirty_pages = set()
+
+        # page -> use count, and count -> pages with that count
+        self.counts = {}
+        self.buckets = {}
+        self.min_count = 0
+        self.aging_interval = aging_interval
+        self.access_counter = 0
+
+        # stats
+        self.agings = 0
+        self.page_faults = 0
+        self.disk_reads = 0
+        self.disk_writes = 0
+        self.disk_accesses = 0
+
+    def set_debug(self):
+        self.debug = True
+
+    def reset_debug(self):
+        self.debug = False
+
+    def get_frame(self, page_number):
+        return self.table.get(page_number)
+
+    def _add_to_bucket(self, page_number, count):
+        bucket = self.buckets.get(count)
+        if bucket is None:
+            bucket = self.buckets[count] = OrderedDict()
+        bucket[page_number] = None
+
+    def _remove_from_bucket(self, page_number, count):
+        bucket = self.buckets[count]
+        del bucket[page_number]
+        if not bucket:
+            del self.buckets[count]
+            if self.min_count == count:
+                self.min_count = count + 1
+
+    def _age(self):
+        """Halve every use count, keeping the LRU order inside each bucket."""
+        old_buckets = self.buckets
+        self.buckets = {}
+        for count in sorted(old_buckets):
+            new_count = max(1, count >> 1)
+            for page_number in old_buckets[count]:
+                self.counts[page_number] = new_count
+                self._add_to_bucket(page_number, new_count)
+        self.min_count = min(self.buckets) if self.buckets else 0
+        self.agings += 1
+
+    def _allocate_frame_for(self, page_number):
+        frame = self.free_frames.allocate()
+        if frame is not None:
+            return frame
+
+        # No free frame: evict the LRU page of the lowest count bucket
+        bucket = self.buckets[self.min_count]
+        victim_page, _ = bucket.popitem(last=False)
+        if not bucket:
+            del self.buckets[self.min_count]
+        del self.counts[victim_page]
+        victim_frame = self.table.pop(victim_page)
+
+        if self.debug:
+            print(f"Evicting page {victim_page} from frame {victim_frame}")
+
+        # Write back if dirty
+        if victim_page in self.dirty_pages:
+            self.disk_writes += 1
+            self.dirty_pages.remove(victim_page)
+            if self.debug:
+                print(f"Writing dirty page {victim_page} to disk (disk_writes={self.disk_writes})")
+
+        self.frame_table[victim_frame] = NO_PAGE
+        return victim_frame
+
+    def _access(self, page_number):
+        """Update the use counts for one access. Returns True on a page fault."""
+        self.access_counter += 1
+        if self.aging_interval and self.access_counter % self.aging_interval == 0:
+            self._age()
+
+        count = self.counts.get(page_number)
+        if count is not None:  # HIT
+            self._remove_from_bucket(page_number, count)
+            self.counts[page_number] = count + 1
+            self._add_to_bucket(page_number, count + 1)
+            return False
+
+        # PAGE FAULT
+        self.page_faults += 1
+        self.disk_reads += 1
+        frame = self._allocate_frame_for(page_number)
+        self.counts[page_number] = 1
+        self._add_to_bucket(page_number, 1)
+        self.min_count = 1
+        self.frame_table[frame] = page_number
+        self.table[page_number] = frame
+        return True
+
+    def read_memory(self, page_number):
+        fault = self._access(page_number)
+        if self.debug:
+            if fault:
+                print(f"Read miss: loading page {page_number} into frame {self.table[page_number]} (disk_reads={self.disk_reads})")
+            else:
+                print(f"Read hit: page {page_number} in frame {self.table[page_number]}")
+            print("="*50 + "\n")
+        return fault
+
+    def write_memory(self, page_number):
+        fault = self._access(page_number)
+        self.dirty_pages.add(page_number)
+        if self.debug:
+            if fault:
+                print(f"Write miss: loading page {page_number} into frame {self.table[page_number]} (disk_reads={self.disk_reads})")
+            else:
+                print(f"Write hit: marked page {page_number} dirty in frame {self.table[page_number]}")
+            print("="*50 + "\n")
+        return fault
+
+    def get_total_disk_reads(self):
+        return self.disk_reads
+
+    def get_total_disk_writes(self):
+        return self.disk_writes
+
+    def get_total_page_faults(self):
+        return self.page_faults
+
+    def get_disk_accesses(self):
+        return self.disk_accesses
+
+    def get_report(self):
+        if self.aging_interval:
+            return [f"lfu agings: {self.agings} (every {self.aging_interval} accesses)"]
+        return []
+
+    def print_page_table(self):
+        if not self.debug:
+            return
+        table = ['-'] * self.frames
+        for i, page in enumerate(self.frame_table):
+            if page != NO_PAGE:
+                table[i] = str(page)
+        print("Page Table:", " ".join(table))
+        print("-" * 40)
@@ -0,0 +1,56 @@
+import unittest
+from lfummu import LfuMMU
+
+
+class TestLfuMMU(unittest.TestCase):
+    def test_evicts_from_lowest_bucket(self):
+        mmu = LfuMMU(3)
+        for page in (1, 1, 1, 2, 2, 3):
+            mmu.read_memory(page)
+        self.assertEqual(mmu.min_count, 1)
+        mmu.read_memory(4)      # 3 is the only page used once
+        self.assertNotIn(3, mmu.table)
+        self.assertEqual(mmu.counts, {1: 3, 2: 2, 4: 1})
+
+    def test_ties_go_to_least_recently_used(self):
+        mmu = LfuMMU(3)
+        for page in (1, 2, 3, 2, 1, 3):
+            mmu.read_memory(page)
+        # all have count 2; 2 reached the bucket first
+        self.assertEqual(list(mmu.buckets[2]), [2, 1, 3])
+        mmu.read_memory(4)
+        self.assertNotIn(2, mmu.table)
+
+    def test_aging_halves_counts(self):
+        mmu = LfuMMU(4, aging_interval=8)
+        for page in (1, 1, 1, 1, 1, 2, 2):
+            mmu.read_memory(page)
+        self.assertEqual(mmu.counts, {1: 5, 2: 2})
+        mmu.read_memory(3)      # the 8th access ages first, then counts 3
+        self.assertEqual(mmu.agings, 1)
+        self.assertEqual(mmu.counts, {1: 2, 2: 1, 3: 1})
+        self.assertEqual(list(mmu.buckets[1]), [2, 3])
+        self.assertEqual(mmu.min_count, 1)
+
+    def test_min_count_after_aging(self):
+        mmu = LfuMMU(2, aging_interval=6)
+        for page in (1, 1, 1, 2, 2):
+            mmu.read_memory(page)
+        self.assertEqual(mmu.min_count, 2)
+        mmu.read_memory(2)      # ages: 1 -> 1, 2 -> 1, then 2 -> 2
+        self.assertEqual(mmu.counts, {1: 1, 2: 2})
+        self.assertEqual(mmu.min_count, 1)
+        mmu.read_memory(5)      # the formerly hot page 1 is now the victim
+        self.assertNotIn(1, mmu.table)
+
+    def test_write_back_of_dirty_victim(self):
+        mmu = LfuMMU(1)
+        mmu.write_memory(1)
+        mmu.read_memory(2)
+        mmu.read_memory(3)
+        self.assertEqual(mmu.get_total_disk_writes(), 1)
+        self.assertEqual(mmu.get_total_page_faults(), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
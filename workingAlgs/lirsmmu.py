@@ -0,0 +1,212 @@
+from mmu import MMU, NO_PAGE
+from array import array
+from framepool import FreeFramePool
+from collections import OrderedDict
+
+"""LIRS (Low Inter-reference Recency Set) replacement, Jiang and Zhang.
+Pages are hot (LIR) or cold (HIR). Most frames hold hot pages; a small
+share (1%, at least one frame) holds resident cold pages, and only those
+are evicted. A cold page that is used again while it is still in the
+recency stack S has a shorter reuse distance than the coldest hot page, so
+it becomes hot and the hot page at the bottom of S turns cold.
+
+    stack:       recency stack S, bottom (oldest) first; holds hot pages,
+                 resident cold pages and non-resident cold "test" pages
+    queue:       resident cold pages, next victim first
+    nonresident: test pages still in S, oldest first; capped at `frames`
+                 entries so the metadata stays bounded
+
+The bottom of S is always a hot page: cold entries that reach the bottom
+are pruned. Each entry is pruned at most once per push, so an access costs
+amortized O(1).
+"""
+class LirsMMU(MMU):
+    __slots__ = ("frames", "debug", "frame_table", "free_frames", "table", "dirty_pages",
+                 "lir_limit", "lir", "stack", "queue", "nonresident", "nonresident_limit",
+                 "promotions", "demotions", "page_faults", "disk_reads", "disk_writes",
+                 "disk_accesses")
+
+    def __init__(self, frames, debug=False):
+        self.frames = frames
+        self.debug = debug
+
+        # frame -> page mapping
+        self.frame_table = array('q', [NO_PAGE]) * frames
+        self.free_frames = FreeFramePool(frames)
+
+        # page -> frame mapping
+        self.table = {}
+
+        # set of pages currently marked dirty
+        self.dirty_pages = set()
+
+        # hot set size and the LIRS structures
+        self.lir_limit = max(1, frames - max(1, frames // 100))
+        self.lir = set()
+        self.stack = OrderedDict()
+        self.queue = OrderedDict()
+        self.nonresident = OrderedDict()
+        self.nonresident_limit = frames
+
+        # stats
+        self.promotions = 0     # cold -> hot
+        self.demotions = 0      # hot -> cold
+        self.page_faults = 0
+        self.disk_reads = 0
+        self.disk_writes = 0
+        self.disk_accesses = 0
+
+    def set_debug(self):
+        self.debug = True
+
+    def reset_debug(self):
+        self.debug = False
+
+    def get_frame(self, page_number):
+        return self.table.get(page_number)
+
+    def _prune(self):
+        """Pop cold entries off the bottom of the stack."""
+        stack = self.stack
+        while stack:
+            bottom = next(iter(stack))
+            if bottom in self.lir:
+                return
+            del stack[bottom]
+            self.nonresident.pop(bottom, None)
+
+    def _demote_bottom(self):
+        """Turn the hot page at the bottom of the stack into a resident cold page."""
+        page_number, _ = self.stack.popitem(last=False)
+        self.lir.remove(page_number)
+        self.queue[page_number] = None
+        self.demotions += 1
+        self._prune()
+
+    def _promote(self, page_number):
+        """Make a cold page that was found in the stack hot."""
+        self.stack.move_to_end(page_number)
+        self.lir.add(page_number)
+        self.promotions += 1
+        if len(self.lir) > self.lir_limit:
+            self._demote_bottom()
+
+    def _evict(self):
+        """Evict the first resident cold page and return its frame."""
+        if not self.queue:
+            # only when every resident page is hot, e.g. with one frame
+            self._demote_bottom()
+        victim_page, _ = self.queue.popitem(last=False)
+        victim_frame = self.table.pop(victim_page)
+
+        if self.debug:
+            print(f"Evicting page {victim_page} from frame {victim_frame}")
+
+        # Write back if dirty
+        if victim_page in self.dirty_pages:
+            self.disk_writes += 1
+            self.dirty_pages.remove(victim_page)
+            if self.debug:
+                print(f"Writing dirty page {victim_page} to disk (disk_writes={self.disk_writes})")
+
+        # keep it in the stack as a non-resident test page
+        if victim_page in self.stack:
+            self.nonresident[victim_page] = None
+            if len(self.nonresident) > self.nonresident_limit:
+                oldest, _ = self.nonresident.popitem(last=False)
+                del self.stack[oldest]
+                self._prune()
+
+        self.frame_table[victim_frame] = NO_PAGE
+        return victim_frame
+
+    def _access(self, page_number):
+        """Update the LIRS structures for one access. Returns True on a page fault."""
+        stack = self.stack
+        if page_number in self.lir:
+            # hot hit: move to the top, prune if it was the bottom
+            was_bottom = next(iter(stack)) == page_number
+            stack.move_to_end(page_number)
+            if was_bottom:
+                self._prune()
+            return False
+
+        if page_number in self.table:
+            # resident cold hit
+            if page_number in stack:
+                del self.queue[page_number]
+                self._promote(page_number)
+            else:
+                stack[page_number] = None
+                self.queue.move_to_end(page_number)
+            return False
+
+        # PAGE FAULT
+        self.page_faults += 1
+        self.disk_reads += 1
+        frame = self.free_frames.allocate()
+        if frame is None:
+            frame = self._evict()
+
+        if page_number in stack:
+            # a test page: its reuse distance beat the coldest hot page
+            del self.nonresident[page_number]
+            self._promote(page_number)
+        elif len(self.lir) < self.lir_limit:
+            stack[page_number] = None
+            self.lir.add(page_number)
+        else:
+            stack[page_number] = None
+            self.queue[page_number] = None
+
+        self.frame_table[frame] = page_number
+        self.table[page_number] = frame
+        return True
+
+    def read_memory(self, page_number):
+        fault = self._access(page_number)
+        if self.debug:
+            if fault:
+                print(f"Read miss: loading page {page_number} into frame {self.table[page_number]} (disk_reads={self.disk_reads})")
+            else:
+                print(f"Read hit: page {page_number} in frame {self.table[page_number]}")
+            print("="*50 + "\n")
+        return fault
+
+    def write_memory(self, page_number):
+        fault = self._access(page_number)
+        self.dirty_pages.add(page_number)
+        if self.debug:
+            if fault:
+                print(f"Write miss: loading page {page_number} into frame {self.table[page_number]} (disk_reads={self.disk_reads})")
+            else:
+                print(f"Write hit: marked page {page_number} dirty in frame {self.table[page_number]}")
+            print("="*50 + "\n")
+        return fault
+
+    def get_total_disk_reads(self):
+        return self.disk_reads
+
+    def get_total_disk_writes(self):
+        return self.disk_writes
+
+    def get_total_page_faults(self):
+        return self.page_faults
+
+    def get_disk_accesses(self):
+        return self.disk_accesses
+
+    def get_report(self):
+        return [f"lirs hot pages: {len(self.lir)}, resident cold pages: {len(self.queue)}, "
+                f"test pages: {len(self.nonresident)}",
+                f"lirs promotions: {self.promotions}, demotions: {self.demotions}"]
+
+    def print_page_table(self):
+        if not self.debug:
+            return
+        table = ['-'] * self.frames
+        for i, page in enumerate(self.frame_table):
+            if page != NO_PAGE:
+                table[i] = str(page)
+        print("Page Table:", " ".join(table))
+        print("-" * 40)
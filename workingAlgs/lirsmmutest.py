@@ -0,0 +1,38 @@
+import unittest
+import random
+from clockmmu import ClockMMU
+from lirsmmu import LirsMMU
+
+
+class TestLirsMMU(unittest.TestCase):
+    def test_loop_larger_than_memory(self):
+        # a loop over 12 pages with 10 frames: clock misses every access,
+        # lirs keeps most of the loop resident
+        lirs = LirsMMU(10)
+        clock = ClockMMU(10)
+        for _ in range(50):
+            for page in range(12):
+                lirs.read_memory(page)
+                clock.read_memory(page)
+        self.assertEqual(clock.get_total_page_faults(), 600)
+        self.assertLess(lirs.get_total_page_faults(), 200)
+
+    def test_structures_stay_consistent(self):
+        rng = random.Random(11)
+        frames = 6
+        mmu = LirsMMU(frames)
+        for _ in range(5000):
+            page = rng.randrange(25)
+            if rng.random() < 0.3:
+                mmu.write_memory(page)
+            else:
+                mmu.read_memory(page)
+            self.assertLessEqual(len(mmu.table), frames)
+            self.assertLessEqual(len(mmu.lir), mmu.lir_limit)
+            self.assertEqual(len(mmu.table), len(mmu.lir) + len(mmu.queue))
+            self.assertLessEqual(len(mmu.nonresident), frames)
+            self.assertIn(next(iter(mmu.stack)), mmu.lir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,26 +1,42 @@
-from mmu import MMU    # keep if the skeleton expects subclassing
+from mmu import MMU, NO_PAGE    # keep if the skeleton expects subclassing
+from framepool import FreeFramePool
+from pagetable import PageTableMixin
+from tracefile import open_trace
+from array import array
 import random
 import sys
 
-class LruMMU(MMU):
+class LruMMU(PageTableMixin, MMU):
     PAGE_SIZE = 4096  # 4 KB pages
 
-    def __init__(self, frames, debug=False):
+    __slots__ = ("frames", "debug", "frame_table", "free_frames", "dirty_bits", "older",
+                 "newer", "page_faults", "disk_reads", "disk_writes", "disk_accesses")
+
+    def __init__(self, frames, debug=False, interner=None):
         self.frames = frames
         self.debug = debug
 
-        # frame -> page mapping
-        self.frame_table = [None] * frames
+        # frame -> page mapping (NO_PAGE when empty)
+        self.frame_table = array('q', [NO_PAGE]) * frames
+        self.free_frames = FreeFramePool(frames)
 
-        # page -> frame mapping
-        self.table = {}
+        # page -> frame mapping (see PageTableMixin)
+        self._init_page_table(interner)
 
-        # set of pages currently marked dirty
-        self.dirty_pages = set()
+        # dirty bit per frame
+        self.dirty_bits = bytearray(frames)
 
-        # track  recently used
-        self.last_used = {}  
-        self.access_counter = 0
+        # recency order: a doubly linked list threaded through the occupied
+        # frames, older[f] / newer[f] being the frames used just before /
+        # after f. Index `frames` is the list head, so newer[frames] is the
+        # least recently used frame (the victim) and older[frames] the most
+        # recently used one. The links are lists rather than arrays: they
+        # are read and written on every hit, list indexing is several times
+        # faster than array indexing, and the int objects they point to are
+        # the frame numbers already held by `table`, so they still cost
+        # only 8 bytes per frame each.
+        self.older = [frames] * (frames + 1)
+        self.newer = [frames] * (frames + 1)
 
         # stats
         self.page_faults = 0
@@ -44,57 +60,83 @@ class LruMMU(MMU):
         self.frame_table[frame] = page_number
 
     def is_frame_empty(self, frame):
-        return self.frame_table[frame] is None
+        return self.frame_table[frame] == NO_PAGE
 
     def get_frame_content(self, frame):
-        return self.frame_table[frame]
+        page_number = self.frame_table[frame]
+        return None if page_number == NO_PAGE else page_number
 
     def set_frame_content(self, frame, content):
         old = self.frame_table[frame]
-        if old is not None and old in self.table:
+        if old != NO_PAGE and old in self.table:
             del self.table[old]
-        self.frame_table[frame] = content
+        self.frame_table[frame] = NO_PAGE if content is None else content
         if content is not None:
             self.table[content] = frame
-    
+
+    # recency list helpers
+    def _unlink(self, frame):
+        older, newer = self.older, self.newer
+        before, after = older[frame], newer[frame]
+        newer[before] = after
+        older[after] = before
+
+    def _make_newest(self, frame):
+        older, newer = self.older, self.newer
+        head = self.frames
+        newest = older[head]
+        newer[newest] = frame
+        older[frame] = newest
+        newer[frame] = head
+        older[head] = frame
+
+    def _touch(self, frame):
+        """Move a resident frame to the most recently used end."""
+        if self.older[self.frames] != frame:
+            self._unlink(frame)
+            self._make_newest(frame)
+
     def _allocate_frame_for(self, page_number):
         """Return a free frame or evict the least recently used page."""
         # Try to find a free frame
-        for idx, occupant in enumerate(self.frame_table):
-            if occupant is None:
-                return idx
-
-        # No free frame: pick LRU victim
-        victim_page = min(self.last_used, key=self.last_used.get)
-        victim_frame = self.table[victim_page]
+        frame = self.free_frames.allocate()
+        if frame is not None:
+            return frame
+
+        # No free frame: pick LRU victim (front of the recency order)
+        newer = self.newer
+        head = self.frames
+        victim_frame = newer[head]
+        after = newer[victim_frame]
+        newer[head] = after
+        self.older[after] = head
+        victim_page = self.frame_table[victim_frame]
 
         if self.debug:
-            print(f"Evicting page {victim_page} from frame {victim_frame}")
+            print(f"Evicting page {self.page_label(victim_page)} from frame {victim_frame}")
 
         # Write back if dirty
-        if victim_page in self.dirty_pages:
+        if self.dirty_bits[victim_frame]:
             self.disk_writes += 1
-            self.dirty_pages.remove(victim_page)
+            self.dirty_bits[victim_frame] = 0
             if self.debug:
-                print(f"Writing dirty page {victim_page} to disk (disk_writes={self.disk_writes})")
+                print(f"Writing dirty page {self.page_label(victim_page)} to disk (disk_writes={self.disk_writes})")
 
         # Remove old mappings
         del self.table[victim_page]
-        del self.last_used[victim_page]
-        self.frame_table[victim_frame] = None
+        self.frame_table[victim_frame] = NO_PAGE
 
         return victim_frame
 
     # simulate read access
     def read_memory(self, page_number):
-        """Simulate a read access. Increment counter once per call."""
-        self.access_counter += 1  # only once per step
-
-        if page_number in self.table:  # HIT
+        """Simulate a read access."""
+        frame = self.table.get(page_number)
+        if frame is not None:  # HIT
             if self.debug:
-                print(f"Read hit: page {page_number} in frame {self.table[page_number]}")
+                print(f"Read hit: page {self.page_label(page_number)} in frame {frame}")
                 print("="*50 + "\n")
-            self.last_used[page_number] = self.access_counter  # update LRU
+            self._touch(frame)  # update LRU
             return False
 
         # PAGE FAULT
@@ -105,24 +147,23 @@ class LruMMU(MMU):
         # install mapping
         self.frame_table[frame] = page_number
         self.table[page_number] = frame
-        self.last_used[page_number] = self.access_counter  # update LRU after allocation
+        self._make_newest(frame)  # update LRU after allocation
 
         if self.debug:
-            print(f"Read miss: loading page {page_number} into frame {frame} (disk_reads={self.disk_reads})")
+            print(f"Read miss: loading page {self.page_label(page_number)} into frame {frame} (disk_reads={self.disk_reads})")
             print("="*50 + "\n")
 
         return True
 
     # simulate write access
     def write_memory(self, page_number):
-        """Simulate a write access. Increment counter once per call."""
-        self.access_counter += 1  # only once per step
-
-        if page_number in self.table:  # HIT
-            self.dirty_pages.add(page_number)
-            self.last_used[page_number] = self.access_counter  # update LRU
+        """Simulate a write access."""
+        frame = self.table.get(page_number)
+        if frame is not None:  # HIT
+            self.dirty_bits[frame] = 1
+            self._touch(frame)  # update LRU
             if self.debug:
-                print(f"Write hit: marked page {page_number} dirty in frame {self.table[page_number]}")
+                print(f"Write hit: marked page {self.page_label(page_number)} dirty in frame {frame}")
                 print("="*50 + "\n")
             return False
 
@@ -134,15 +175,86 @@ class LruMMU(MMU):
         # install mapping and mark dirty
         self.frame_table[frame] = page_number
         self.table[page_number] = frame
-        self.dirty_pages.add(page_number)
-        self.last_used[page_number] = self.access_counter  # update LRU after allocation
+        self.dirty_bits[frame] = 1
+        self._make_newest(frame)  # update LRU after allocation
 
         if self.debug:
-            print(f"Write miss: loading page {page_number} into frame {frame} (disk_reads={self.disk_reads})")
+            print(f"Write miss: loading page {self.page_label(page_number)} into frame {frame} (disk_reads={self.disk_reads})")
             print("="*50 + "\n")
 
         return True
 
+    # simulate a batch of accesses (see MMU.access_batch)
+    def access_batch(self, pages, is_write, fault_bitmap=None):
+        if self.debug:
+            return MMU.access_batch(self, pages, is_write, fault_bitmap)
+
+        # local names keep attribute lookups out of the loop; the list
+        # operations are inlined for the same reason
+        table, lookup, unmap = self._batch_table()
+        frame_table = self.frame_table
+        dirty_bits = self.dirty_bits
+        older = self.older
+        newer = self.newer
+        head = self.frames
+        allocate_free = self.free_frames.allocate
+        faults = 0
+        write_backs = 0
+        for i, page_number in enumerate(pages):
+            frame = lookup(page_number)
+            if frame is None:
+                # PAGE FAULT
+                faults += 1
+                if fault_bitmap is not None:
+                    fault_bitmap[i >> 3] |= 1 << (i & 7)
+                frame = allocate_free()
+                if frame is None:
+                    # evict the least recently used frame
+                    frame = newer[head]
+                    after = newer[frame]
+                    newer[head] = after
+                    older[after] = head
+                    if dirty_bits[frame]:
+                        write_backs += 1
+                        dirty_bits[frame] = 0
+                    unmap(frame_table[frame])
+                frame_table[frame] = page_number
+                table[page_number] = frame
+            elif older[head] == frame:
+                # HIT on the most recently used frame: nothing to move
+                if is_write[i]:
+                    dirty_bits[frame] = 1
+                continue
+            else:
+                # HIT: unlink the frame
+                before = older[frame]
+                after = newer[frame]
+                newer[before] = after
+                older[after] = before
+            # link the frame in as the most recently used
+            newest = older[head]
+            newer[newest] = frame
+            older[frame] = newest
+            newer[frame] = head
+            older[head] = frame
+            if is_write[i]:
+                dirty_bits[frame] = 1
+
+        self.page_faults += faults
+        self.disk_reads += faults
+        self.disk_writes += write_backs
+        self.disk_accesses += len(pages)
+        return faults
+
+    # simulate a batch of collapsed runs (see MMU.access_runs); repeated
+    # hits only move the page to the MRU end again, so a run is one access
+    def access_runs(self, pages, counts, any_write):
+        if self.debug:
+            return MMU.access_runs(self, pages, counts, any_write)
+        faults = self.access_batch(pages, any_write)
+        self.disk_accesses += sum(counts) - len(pages)
+        return faults
+
     # stats getters
     def get_total_disk_reads(self):
         return self.disk_reads
@@ -162,8 +274,8 @@ class LruMMU(MMU):
             return
         table = ['-'] * self.frames
         for i, page in enumerate(self.frame_table):
-            if page is not None:
-                table[i] = str(page)
+            if page != NO_PAGE:
+                table[i] = str(self.page_label(page))
         print("Page Table:", " ".join(table))
         print("-" * 40)
 
@@ -179,7 +291,7 @@ def run_trace_file(filename, mmu, debug=False):
         print(f"Running trace from {filename}")
         print("="*50 + "\n")
 
-    with open(filename, 'r') as f:
+    with open_trace(filename, text=True) as f:
         step_num = 1
         for line in f:
             line = line.strip()
@@ -0,0 +1,65 @@
+import unittest
+from lrummu import LruMMU
+
+PAGE_OFFSET = 12
+
+# trace file, frames, expected answer file
+ANSWERS = [
+    ("trace1", 4, "trace1-4frames-lru"),
+    ("trace1", 8, "trace1-8frames-lru"),
+    ("trace2", 6, "trace2-6frames-lru.ans"),
+    ("trace3", 4, "trace3-4frames-lru"),
+]
+
+
+def run_trace(filename, mmu):
+    events = 0
+    with open(filename, 'r') as trace_file:
+        for trace_line in trace_file:
+            trace_cmd = trace_line.strip().split(" ")
+            page_number = int(trace_cmd[0], 16) >> PAGE_OFFSET
+            if trace_cmd[1] == "W":
+                mmu.write_memory(page_number)
+            else:
+                mmu.read_memory(page_number)
+            events += 1
+            mmu.disk_accesses += 1
+    return events
+
+
+def read_answer(filename):
+    answer = {}
+    with open(filename, 'r') as f:
+        for line in f:
+            key, value = line.split(":")
+            answer[key.strip()] = value.strip()
+    return answer
+
+
+class TestLruMMU(unittest.TestCase):
+    def test_answer_files(self):
+        for trace, frames, answer_file in ANSWERS:
+            mmu = LruMMU(frames)
+            events = run_trace(trace, mmu)
+            answer = read_answer(answer_file)
+            self.assertEqual(events, int(answer["events in trace"]))
+            self.assertEqual(mmu.get_total_disk_reads(), int(answer["total disk reads"]))
+            self.assertEqual(mmu.get_total_disk_writes(), int(answer["total disk writes"]))
+
+    def test_evicts_least_recently_used(self):
+        mmu = LruMMU(3)
+        for page in (1, 2, 3):
+            mmu.read_memory(page)
+        mmu.read_memory(1)      # 2 is now least recently used
+        mmu.write_memory(4)     # evicts 2
+        self.assertIsNone(mmu.get_frame(2))
+        self.assertIsNotNone(mmu.get_frame(1))
+        mmu.read_memory(5)      # evicts 3
+        mmu.read_memory(6)      # evicts 1
+        mmu.read_memory(7)      # evicts dirty 4
+        self.assertEqual(mmu.get_total_page_faults(), 7)
+        self.assertEqual(mmu.get_total_disk_writes(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
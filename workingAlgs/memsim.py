@@ -1,9 +1,20 @@
+from cli import find_option, get_int_option, get_option
 from clockmmu import ClockMMU
-from lrummu import LruMMU
-from randmmu import RandMMU
-
+from fanout import parse_frame_list, parse_mode_list, print_fanout, run_fanout
+from latency import LatencyModel, access_timed
+from optmmu import load_next_use
+from policies import POLICIES, create_mmu
+from sweep import parse_frame_range, print_sweep, run_sweep
+from tracefile import PageInterner, collapse_runs, iter_trace_blocks
+
+import os
 import sys
 
+try:
+    import resource     # Unix only; without it the peak memory is not shown
+except ImportError:
+    resource = None
+
 
 def main():
     PAGE_OFFSET = 12  # page is 2^12 = 4KB
@@ -18,36 +29,121 @@ def main():
 
     input_file = sys.argv[1]
 
-    try:
-        with open(input_file, 'r') as file:
-            # Read the trace file contents
-            trace_contents = file.readlines()
-    except FileNotFoundError:
+    # The trace is streamed once in the main loop; only check it exists here
+    if not os.path.exists(input_file):
         print(f"Input '{input_file}' could not be found")
         print("Usage: python memsim.py inputfile numberframes replacementmode debugmode")
         return
 
-    frames = int(sys.argv[2])
-    if frames < 1:
-       printf( "Frame number must be at least 1\n");
-       return
+    options = sys.argv[5:]
 
-    replacement_mode = sys.argv[3]
+    # --seed N makes the victims chosen by rand repeatable
+    try:
+        seed = get_int_option(options, "--seed")
+    except ValueError as err:
+        print(err)
+        return
 
-    # Setup MMU based on replacement mode
-    if replacement_mode == "rand":
-        mmu = RandMMU(frames)
-    elif replacement_mode == "lru":
-        mmu = LruMMU(frames)
-    elif replacement_mode == "esc":
-        mmu = ClockMMU(frames)
-    elif replacement_mode == "clock":
-        mmu = ClockMMU(frames)
+    # several policies (lru,clock) or frame counts (4,8,16) fan out from one
+    # pass over the trace
+    if "," in sys.argv[3] or "," in sys.argv[2]:
+        try:
+            modes = parse_mode_list(sys.argv[3])
+            frame_counts = parse_frame_list(sys.argv[2])
+        except ValueError as err:
+            print(err)
+            return
+        if sys.argv[4] != "quiet":
+            print("Fan-out mode only supports quiet")
+            return
+        unsupported = find_option(options, ("--dense", "--disk", "--queue-depth",
+                                             "--lfu-aging", "--tau", "--jobs"))
+        if unsupported is not None:
+            print(f"Fan-out mode does not support {unsupported}")
+            return
+        configs = [(mode, frames) for mode in modes for frames in frame_counts]
+        try:
+            events, mmus = run_fanout(input_file, configs, "--collapse" in options, seed=seed)
+        except ValueError as err:
+            print(err)
+            return
+        print_fanout(events, configs, mmus)
+        return
 
+    # a frame range (first:last[:step]) runs a sweep instead of one simulation
+    sweep_frames = None
+    if ":" in sys.argv[2]:
+        try:
+            sweep_frames = parse_frame_range(sys.argv[2])
+        except ValueError as err:
+            print(err)
+            return
     else:
-        print("Invalid replacement mode. Valid options are [rand, lru, esc]")
+        frames = int(sys.argv[2])
+        if frames < 1:
+            print("Frame number must be at least 1")
+            return
+
+    replacement_mode = sys.argv[3]
+    if replacement_mode not in POLICIES:
+        print(f"Invalid replacement mode. Valid options are [{', '.join(POLICIES)}]")
         return
 
+    if sweep_frames is not None:
+        if sys.argv[4] != "quiet":
+            print("Sweep mode only supports quiet")
+            return
+        unsupported = find_option(options, ("--dense", "--disk", "--queue-depth",
+                                             "--lfu-aging", "--tau", "--collapse"))
+        if unsupported is not None:
+            print(f"Sweep mode does not support {unsupported}")
+            return
+        try:
+            jobs = get_int_option(options, "--jobs", os.cpu_count() or 1, minimum=1)
+            events, rows = run_sweep(input_file, replacement_mode, sweep_frames, jobs, seed)
+        except ValueError as err:
+            print(err)
+            return
+        print_sweep(events, rows)
+        return
+
+    # Setup MMU based on replacement mode
+    next_use = None
+    if replacement_mode == "opt":
+        # offline policy: needs the next use of every access up front
+        try:
+            next_use = load_next_use(input_file)
+        except ValueError as err:
+            print(err)
+            return
+    # --dense renumbers pages 0, 1, 2, ... as they are first seen so the MMU
+    # can use a list indexed page table
+    interner = PageInterner() if "--dense" in options else None
+    try:
+        # --lfu-aging N halves the lfu use counts every N accesses
+        lfu_aging = get_int_option(options, "--lfu-aging", minimum=1)
+        # --tau N sets the wsclock working set window to the last N accesses
+        tau = get_int_option(options, "--tau", minimum=1)
+        mmu = create_mmu(replacement_mode, frames, next_use, interner, seed, lfu_aging, tau)
+    except ValueError as err:
+        print(err)
+        return
+
+    # --disk hdd|ssd|nvme [--queue-depth Q] turns the disk traffic into time
+    latency = None
+    if "--disk" in options:
+        try:
+            queue_depth = get_int_option(options, "--queue-depth", minimum=1)
+            latency = LatencyModel.from_profile(get_option(options, "--disk"), queue_depth)
+        except ValueError as err:
+            print(err)
+            return
+
+    # esc also runs plain clock on the same trace to report the writes it saves
+    baseline = None
+    if replacement_mode == "esc":
+        baseline = ClockMMU(frames, interner=interner)
+
     debug_mode  = sys.argv[4]
 
     # Set debug mode
@@ -65,25 +161,35 @@ def main():
 
     no_events = 0
 
+    # --collapse applies each run of accesses to one page in a single step
+    collapse = "--collapse" in options
+    no_runs = 0
 
-    with open(input_file, 'r') as trace_file:
-        for trace_line in trace_file:
-            trace_cmd = trace_line.strip().split(" ")
-            logical_address = int(trace_cmd[0], 16)
-            page_number = logical_address >>  PAGE_OFFSET
-
-
-            # Process read or write
-            if trace_cmd[1] == "R":
-                mmu.read_memory(page_number)
-            elif trace_cmd[1] == "W":
-                mmu.write_memory(page_number)
+    try:
+        for pages, writes in iter_trace_blocks(input_file, PAGE_OFFSET):
+            if interner is not None:
+                pages = interner.intern(pages)
+            if collapse:
+                run_pages, counts, any_write = collapse_runs(pages, writes)
+                if latency is None:
+                    mmu.access_runs(run_pages, counts, any_write)
+                else:
+                    access_timed(mmu, latency, run_pages, any_write, counts)
+                if baseline is not None:
+                    baseline.access_runs(run_pages, counts, any_write)
+                no_runs += len(run_pages)
             else:
-                print(f"Badly formatted file. Error on line {no_events + 1}")
-                return
-
-            no_events += 1
-            mmu.disk_accesses += 1
+                if latency is None:
+                    mmu.access_batch(pages, writes)
+                else:
+                    access_timed(mmu, latency, pages, writes)
+                if baseline is not None:
+                    baseline.access_batch(pages, writes)
+            no_events += len(pages)
+    except ValueError as err:
+        # "Badly formatted file. Error on line N"
+        print(err)
+        return
 
 
     # TODO: Print results
@@ -98,6 +204,29 @@ def main():
     else:
         print("Page Fault Rate: N/A")
 
+    for line in mmu.get_report():
+        print(line)
+
+    if latency is not None:
+        for line in latency.get_report():
+            print(line)
+
+    if collapse:
+        print(f"runs after collapsing: {no_runs}")
+    if interner is not None:
+        print(f"distinct pages: {len(interner)}")
+
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    if resource is not None:
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == "darwin":
+            peak_rss //= 1024
+        print(f"peak memory (RSS): {peak_rss} KB")
+
+    if baseline is not None:
+        avoided = baseline.get_total_disk_writes() - mmu.get_total_disk_writes()
+        print(f"disk writes avoided vs clock: {avoided}")
+
 
 if __name__ == "__main__":
     main()
@@ -7,7 +7,28 @@
 * for the MMU.
 *
 '''
+# frame table entry of an empty frame (page numbers are never negative)
+NO_PAGE = -1
+
+# most samples a policy keeps of a value it reports over time
+MAX_SAMPLES = 100
+
+
+def thin_samples(samples, interval):
+    """Halve a full list of samples taken every `interval` accesses.
+
+    Returns (samples, interval): every other sample is kept and the
+    interval doubles, so the samples stay evenly spaced over the whole run
+    and their number stays below MAX_SAMPLES however long the trace is.
+    """
+    return samples[1::2], 2 * interval
+
+
 class MMU:
+    # no per instance __dict__; subclasses list their attributes in
+    # __slots__ to keep instances compact
+    __slots__ = ()
+
     def read_memory(self, page_number):
         pass
 
@@ -28,3 +49,53 @@ class MMU:
 
     def get_total_page_faults(self):
         return -1
+
+    def access_batch(self, pages, is_write, fault_bitmap=None):
+        # Run a batch of accesses: pages[i] is written when is_write[i] is
+        # true, otherwise read. Returns the number of page faults; when
+        # fault_bitmap (a bytearray of len(pages) / 8 bytes) is given, bit
+        # i % 8 of byte i // 8 is set for every access that faulted.
+        # MMUs may override this with a faster loop.
+        faults = 0
+        for i, page_number in enumerate(pages):
+            if is_write[i]:
+                fault = self.write_memory(page_number)
+            else:
+                fault = self.read_memory(page_number)
+            if fault:
+                faults += 1
+                if fault_bitmap is not None:
+                    fault_bitmap[i >> 3] |= 1 << (i & 7)
+        self.disk_accesses += len(pages)
+        return faults
+
+    def access_runs(self, pages, counts, any_write):
+        # Run a batch of collapsed runs (see tracefile.collapse_runs): run i
+        # is counts[i] consecutive accesses to pages[i], with at least one
+        # write when any_write[i] is true. Only the first access of a run
+        # can fault and nothing is evicted during a run, so the run is
+        # applied as that access (a write when any_write[i], which leaves
+        # the same dirty state) followed by counts[i] - 1 read hits.
+        # Returns the number of page faults. MMUs whose hits are idempotent
+        # may override this to apply each run in one step.
+        faults = 0
+        for i, page_number in enumerate(pages):
+            if any_write[i]:
+                fault = self.write_memory(page_number)
+            else:
+                fault = self.read_memory(page_number)
+            if fault:
+                faults += 1
+            for _ in range(counts[i] - 1):
+                self.read_memory(page_number)
+        self.disk_accesses += sum(counts)
+        return faults
+
+    def page_label(self, page_number):
+        # the page number shown for a page in debug output; MMUs that run
+        # on dense page ids (see tracefile.PageInterner) map them back
+        return page_number
+
+    def get_report(self):
+        # extra policy specific lines printed after the results
+        return []
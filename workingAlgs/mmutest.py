@@ -0,0 +1,110 @@
+import random
+import unittest
+from clockmmu import ClockMMU
+from escmmu import EscMMU
+from lrummu import LruMMU
+from randmmu import RandMMU
+from optmmu import build_next_use
+from policies import DENSE_POLICIES, POLICIES, create_mmu
+from tracefile import PageInterner, collapse_runs, read_trace
+
+
+def run_events(mmu, accesses):
+    faults = []
+    for page_number, is_write in accesses:
+        if is_write:
+            faults.append(mmu.write_memory(page_number))
+        else:
+            faults.append(mmu.read_memory(page_number))
+        mmu.disk_accesses += 1
+    return faults
+
+
+def stats(mmu):
+    return (mmu.get_total_page_faults(), mmu.get_total_disk_reads(),
+            mmu.get_total_disk_writes(), mmu.get_disk_accesses())
+
+
+class TestAccessBatch(unittest.TestCase):
+    def test_batch_matches_single_accesses(self):
+        accesses = list(read_trace("trace3"))
+        pages = [page_number for page_number, _ in accesses]
+        writes = [is_write for _, is_write in accesses]
+        for mmu_class in (RandMMU, LruMMU, ClockMMU, EscMMU):
+            for frames in (1, 3, 8):
+                random.seed(frames)
+                single = mmu_class(frames)
+                expected = run_events(single, accesses)
+
+                random.seed(frames)
+                batched = mmu_class(frames)
+                bitmap = bytearray((len(pages) + 7) // 8)
+                # feed the trace in uneven chunks
+                faults = 0
+                for start in range(0, len(pages), 50):
+                    chunk_bitmap = bytearray(7)
+                    faults += batched.access_batch(pages[start:start + 50],
+                                                   writes[start:start + 50], chunk_bitmap)
+                    for i in range(len(pages[start:start + 50])):
+                        if chunk_bitmap[i >> 3] >> (i & 7) & 1:
+                            bitmap[(start + i) >> 3] |= 1 << ((start + i) & 7)
+
+                self.assertEqual(stats(batched), stats(single), (mmu_class, frames))
+                self.assertEqual(faults, single.get_total_page_faults())
+                got = [bool(bitmap[i >> 3] >> (i & 7) & 1) for i in range(len(pages))]
+                self.assertEqual(got, expected, (mmu_class, frames))
+
+    def test_collapsed_runs_match_single_accesses(self):
+        accesses = list(read_trace("trace2")) + list(read_trace("trace3"))
+        pages = [page_number for page_number, _ in accesses]
+        writes = bytes(is_write for _, is_write in accesses)
+        next_use = build_next_use(pages)
+        run_pages, counts, any_write = collapse_runs(pages, writes)
+        self.assertLess(len(run_pages), len(pages))
+        for mode in POLICIES:
+            for frames in (1, 3, 8):
+                random.seed(frames)
+                single = create_mmu(mode, frames, next_use)
+                run_events(single, accesses)
+
+                random.seed(frames)
+                collapsed = create_mmu(mode, frames, next_use)
+                faults = collapsed.access_runs(run_pages, counts, any_write)
+                self.assertEqual(stats(collapsed), stats(single), (mode, frames))
+                self.assertEqual(faults, single.get_total_page_faults())
+
+    def test_dense_ids_match_page_numbers(self):
+        accesses = list(read_trace("trace2")) + list(read_trace("trace3"))
+        pages = [page_number for page_number, _ in accesses]
+        writes = bytes(is_write for _, is_write in accesses)
+        for mode in DENSE_POLICIES:
+            for frames in (1, 3, 8):
+                random.seed(frames)
+                sparse = create_mmu(mode, frames)
+                sparse.access_batch(pages, writes)
+
+                random.seed(frames)
+                interner = PageInterner()
+                dense = create_mmu(mode, frames, interner=interner)
+                # intern block by block, as memsim does
+                for start in range(0, len(pages), 100):
+                    dense.access_batch(interner.intern(pages[start:start + 100]),
+                                       writes[start:start + 100])
+                self.assertEqual(stats(dense), stats(sparse), (mode, frames))
+                # page_label maps the resident ids back to the same pages
+                self.assertEqual([dense.page_label(page) for page in dense.frame_table],
+                                 list(sparse.frame_table), (mode, frames))
+
+                # single accesses go through the same table
+                random.seed(frames)
+                single = create_mmu(mode, frames, interner=PageInterner())
+                run_events(single, zip(single.interner.intern(pages), writes))
+                self.assertEqual(stats(single), stats(sparse), (mode, frames))
+
+    def test_dense_ids_rejected_by_other_policies(self):
+        with self.assertRaises(ValueError):
+            create_mmu("arc", 4, interner=PageInterner())
+
+
+if __name__ == '__main__':
+    unittest.main()
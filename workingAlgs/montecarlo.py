@@ -0,0 +1,156 @@
+from cli import get_float_option, get_int_option, to_int
+from sharedtrace import SharedTrace
+from sweep import init_worker, load_trace, simulate, simulate_in_worker
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import math
+import os
+import random
+import statistics
+import sys
+
+"""Monte Carlo runs of random replacement. rand gives a different result
+for every seed, so a single run says little; run_montecarlo simulates the
+trace with many seeds and summarizes page faults, disk reads and disk
+writes by their mean, standard deviation and 95% confidence interval of
+the mean.
+
+With more than one job the runs go to a process pool that shares one
+decoded copy of the trace (see sweep.py and sharedtrace.py). Runs are
+made in rounds of one run per worker, and with a target the runs stop
+after the first round (of at least MIN_RUNS runs in total) where the 95%
+confidence interval of the fault rate is narrower than the target.
+
+The seed of every run comes from random.Random(seed), so a seed gives the
+same runs, in the same order, whatever the number of jobs.
+"""
+
+MIN_RUNS = 3
+
+# two sided 95% critical values of Student's t for 1 to 30 degrees of freedom
+T_95 = (12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+        2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+        2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042)
+Z_95 = 1.959964
+
+
+def t_critical(degrees):
+    """95% critical value of Student's t with the given degrees of freedom."""
+    if degrees <= len(T_95):
+        return T_95[degrees - 1]
+    # first correction term of the Cornish-Fisher expansion, within 0.003
+    # of the exact value above 30 degrees of freedom
+    return Z_95 + (Z_95 ** 3 + Z_95) / (4 * degrees)
+
+
+def summarize(values):
+    """Return (mean, standard deviation, half width of the 95% CI)."""
+    mean = statistics.fmean(values)
+    if len(values) < 2:
+        return mean, 0.0, math.inf
+    std = statistics.stdev(values)
+    return mean, std, t_critical(len(values) - 1) * std / math.sqrt(len(values))
+
+
+def run_seeds(runs, seed=None):
+    """The seeds of the first `runs` runs for a Monte Carlo seed."""
+    rng = random.Random(seed)
+    return [rng.getrandbits(32) for _ in range(runs)]
+
+
+def _precise_enough(events, rows, target):
+    if target is None or len(rows) < MIN_RUNS or events == 0:
+        return False
+    _, _, half_width = summarize([faults / events for _, _, _, faults in rows])
+    return 2 * half_width < target
+
+
+def run_montecarlo(filename, frames, runs, jobs, seed=None, target=None):
+    """Simulate rand over a trace with up to `runs` seeds.
+
+    target, if given, is the width of the fault rate confidence interval
+    to stop at. Returns (events, rows) with rows of (seed, disk reads,
+    disk writes, page faults) in run order.
+    """
+    if runs < 1:
+        raise ValueError("Number of runs must be at least 1")
+    if frames < 1:
+        raise ValueError("Frame number must be at least 1")
+    seeds = run_seeds(runs, seed)
+    jobs = max(1, min(jobs, runs))
+    rows = []
+
+    if jobs == 1:
+        pages, writes = load_trace(filename)
+        for run_seed in seeds:
+            _, reads, disk_writes, faults = simulate("rand", frames, pages, writes, seed=run_seed)
+            rows.append((run_seed, reads, disk_writes, faults))
+            if _precise_enough(len(pages), rows, target):
+                break
+        return len(pages), rows
+
+    with SharedTrace.from_file(filename) as trace:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                                 initargs=(trace.handle(),)) as pool:
+            for start in range(0, runs, jobs):
+                round_seeds = seeds[start:start + jobs]
+                results = pool.map(simulate_in_worker, repeat("rand"), repeat(frames),
+                                   round_seeds)
+                for run_seed, (_, reads, disk_writes, faults) in zip(round_seeds, results):
+                    rows.append((run_seed, reads, disk_writes, faults))
+                if _precise_enough(trace.count, rows, target):
+                    break
+        return trace.count, rows
+
+
+def print_montecarlo(events, frames, rows, runs, target=None):
+    print(f"events in trace: {events}")
+    print(f"total memory frames: {frames}")
+    line = f"runs: {len(rows)} of {runs}"
+    if len(rows) < runs:
+        line += f" (fault rate CI narrower than {target})"
+    print(line)
+    print(f"{'':>12} {'mean':>12} {'std':>12} {'95% CI low':>12} {'95% CI high':>12}")
+    columns = [
+        ("page faults", [faults for _, _, _, faults in rows], 2),
+        ("disk reads", [reads for _, reads, _, _ in rows], 2),
+        ("disk writes", [writes for _, _, writes, _ in rows], 2),
+    ]
+    if events > 0:
+        columns.append(("fault rate", [faults / events for _, _, _, faults in rows], 6))
+    for name, values, digits in columns:
+        mean, std, half_width = summarize(values)
+        line = f"{name:>12} {mean:>12.{digits}f} {std:>12.{digits}f}"
+        if math.isinf(half_width):
+            # one run gives no interval
+            line += f" {'-':>12} {'-':>12}"
+        else:
+            line += f" {mean - half_width:>12.{digits}f} {mean + half_width:>12.{digits}f}"
+        print(line)
+
+
+# -------------------------------------------------
+# CLI Entry
+# -------------------------------------------------
+if __name__ == "__main__":
+    if len(sys.argv) < 4:
+        print("Usage: python3 montecarlo.py <trace_file> <frames> <runs> "
+              "[--jobs J] [--seed S] [--target W]")
+        sys.exit(1)
+
+    options = sys.argv[4:]
+    try:
+        frames = to_int(sys.argv[2], "frames", minimum=1)
+        runs = to_int(sys.argv[3], "runs", minimum=1)
+        jobs = get_int_option(options, "--jobs", os.cpu_count() or 1, minimum=1)
+        seed = get_int_option(options, "--seed")
+        target = get_float_option(options, "--target")
+        events, rows = run_montecarlo(sys.argv[1], frames, runs, jobs, seed, target)
+    except FileNotFoundError:
+        print(f"Input '{sys.argv[1]}' could not be found")
+        sys.exit(1)
+    except ValueError as err:
+        print(err)
+        sys.exit(1)
+
+    print_montecarlo(events, frames, rows, runs, target)
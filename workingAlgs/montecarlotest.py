@@ -0,0 +1,37 @@
+import math
+import unittest
+from montecarlo import MIN_RUNS, run_montecarlo, run_seeds, summarize, t_critical
+from sweep import load_trace, simulate
+
+
+class TestMonteCarlo(unittest.TestCase):
+    def test_summarize(self):
+        mean, std, half_width = summarize([2, 4, 4, 4, 5, 5, 7, 9])
+        self.assertEqual(mean, 5)
+        self.assertAlmostEqual(std, math.sqrt(32 / 7))
+        self.assertAlmostEqual(half_width, 2.365 * math.sqrt(32 / 7) / math.sqrt(8))
+        self.assertEqual(summarize([3]), (3, 0.0, math.inf))
+
+    def test_t_critical_approaches_normal(self):
+        self.assertAlmostEqual(t_critical(30), 2.042, places=2)
+        self.assertAlmostEqual(t_critical(60), 2.000, places=2)
+        self.assertAlmostEqual(t_critical(10 ** 6), 1.96, places=2)
+
+    def test_runs_match_single_simulations(self):
+        pages, writes = load_trace("trace3")
+        seeds = run_seeds(4, seed=9)
+        expected = [(run_seed,) + simulate("rand", 3, pages, writes, seed=run_seed)[1:]
+                    for run_seed in seeds]
+        for jobs in (1, 2):
+            self.assertEqual(run_montecarlo("trace3", 3, 4, jobs, seed=9),
+                             (len(pages), expected))
+
+    def test_stops_early_at_target(self):
+        events, rows = run_montecarlo("trace3", 3, 50, 1, seed=9, target=1.0)
+        self.assertEqual(len(rows), MIN_RUNS)
+        events, rows = run_montecarlo("trace3", 3, 6, 1, seed=9, target=0.0)
+        self.assertEqual(len(rows), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
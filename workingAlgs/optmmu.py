@@ -0,0 +1,221 @@
+from mmu import MMU, NO_PAGE
+from framepool import FreeFramePool
+from tracefile import iter_trace_blocks
+from array import array
+import heapq
+
+"""Belady's optimal (OPT/MIN) replacement: evict the resident page whose
+next use is farthest in the future. This needs the whole trace up front,
+so it is an offline baseline for judging the other policies.
+
+next_use[i] is the position of the next access to the page accessed at
+position i (or len(trace) if it is never used again). It is built in one
+backward pass and stored in a flat array of 8-byte ints, so memory grows
+by 16 bytes per event while it is built and 8 bytes per event after that.
+
+Resident pages sit in a max-heap keyed by their next use. Entries go stale
+when a page is used again; stale entries are skipped when popped, and the
+heap is rebuilt once it holds more than twice the frame count, so it stays
+O(frames) in size and each eviction is O(log frames) amortized.
+"""
+
+
+def build_next_use(pages, next_use=None):
+    """Return an array with the position of the next access to pages[i].
+
+    next_use may be a preallocated int64 buffer of len(pages) to fill.
+    """
+    never = len(pages)
+    if next_use is None:
+        next_use = array('q', [never]) * never
+    seen = {}
+    for i in range(never - 1, -1, -1):
+        page_number = pages[i]
+        next_use[i] = seen.get(page_number, never)
+        seen[page_number] = i
+    return next_use
+
+
+def load_next_use(filename):
+    """Read a trace file and return its next use array."""
+    pages = array('q')
+    for block_pages, _ in iter_trace_blocks(filename):
+        pages.extend(block_pages)
+    return build_next_use(pages)
+
+
+class OptMMU(MMU):
+    __slots__ = ("frames", "debug", "next_use", "position", "frame_table", "free_frames",
+                 "table", "dirty_pages", "page_next_use", "heap", "page_faults",
+                 "disk_reads", "disk_writes", "disk_accesses")
+
+    def __init__(self, frames, next_use, debug=False):
+        self.frames = frames
+        self.debug = debug
+
+        # next use position of every access, and the position of the next
+        # access to be simulated
+        self.next_use = next_use
+        self.position = 0
+
+        # frame -> page mapping
+        self.frame_table = array('q', [NO_PAGE]) * frames
+        self.free_frames = FreeFramePool(frames)
+
+        # page -> frame mapping
+        self.table = {}
+
+        # set of pages currently marked dirty
+        self.dirty_pages = set()
+
+        # page -> next use of a resident page, and a max-heap of
+        # (-next use, page) entries that may contain stale entries
+        self.page_next_use = {}
+        self.heap = []
+
+        # stats
+        self.page_faults = 0
+        self.disk_reads = 0
+        self.disk_writes = 0
+        self.disk_accesses = 0
+
+    def set_debug(self):
+        self.debug = True
+
+    def reset_debug(self):
+        self.debug = False
+
+    def get_frame(self, page_number):
+        return self.table.get(page_number)
+
+    def _touch(self, page_number):
+        """Record the next use of the page accessed at the current position."""
+        next_position = self.next_use[self.position]
+        self.position += 1
+        self.page_next_use[page_number] = next_position
+        heapq.heappush(self.heap, (-next_position, page_number))
+        if len(self.heap) > 2 * self.frames + 16:
+            # drop stale entries
+            self.heap = [(-nxt, page) for page, nxt in self.page_next_use.items()]
+            heapq.heapify(self.heap)
+
+    def _pop_victim(self):
+        """Return the resident page with the farthest next use."""
+        while True:
+            neg_next, page_number = heapq.heappop(self.heap)
+            if self.page_next_use.get(page_number) == -neg_next:
+                return page_number
+
+    def _allocate_frame_for(self, page_number):
+        frame = self.free_frames.allocate()
+        if frame is not None:
+            return frame
+
+        # No free frame: evict the page used farthest in the future
+        victim_page = self._pop_victim()
+        victim_frame = self.table[victim_page]
+
+        if self.debug:
+            print(f"Evicting page {victim_page} from frame {victim_frame}")
+
+        # Write back if dirty
+        if victim_page in self.dirty_pages:
+            self.disk_writes += 1
+            self.dirty_pages.remove(victim_page)
+            if self.debug:
+                print(f"Writing dirty page {victim_page} to disk (disk_writes={self.disk_writes})")
+
+        del self.table[victim_page]
+        del self.page_next_use[victim_page]
+        self.frame_table[victim_frame] = NO_PAGE
+        return victim_frame
+
+    def read_memory(self, page_number):
+        if page_number in self.table:  # HIT
+            if self.debug:
+                print(f"Read hit: page {page_number} in frame {self.table[page_number]}")
+                print("="*50 + "\n")
+            self._touch(page_number)
+            return False
+
+        # PAGE FAULT
+        self.page_faults += 1
+        self.disk_reads += 1
+        frame = self._allocate_frame_for(page_number)
+
+        self.frame_table[frame] = page_number
+        self.table[page_number] = frame
+        self._touch(page_number)
+
+        if self.debug:
+            print(f"Read miss: loading page {page_number} into frame {frame} (disk_reads={self.disk_reads})")
+            print("="*50 + "\n")
+
+        return True
+
+    def write_memory(self, page_number):
+        if page_number in self.table:  # HIT
+            self.dirty_pages.add(page_number)
+            self._touch(page_number)
+            if self.debug:
+                print(f"Write hit: marked page {page_number} dirty in frame {self.table[page_number]}")
+                print("="*50 + "\n")
+            return False
+
+        # PAGE FAULT
+        self.page_faults += 1
+        self.disk_reads += 1
+        frame = self._allocate_frame_for(page_number)
+
+        self.frame_table[frame] = page_number
+        self.table[page_number] = frame
+        self.dirty_pages.add(page_number)
+        self._touch(page_number)
+
+        if self.debug:
+            print(f"Write miss: loading page {page_number} into frame {frame} (disk_reads={self.disk_reads})")
+            print("="*50 + "\n")
+
+        return True
+
+    def access_runs(self, pages, counts, any_write):
+        """Simulate a batch of collapsed runs (see MMU.access_runs).
+
+        Only the next use after the last access of a run matters, so each
+        run is applied as one access at the position of its last access.
+        """
+        if self.debug:
+            return MMU.access_runs(self, pages, counts, any_write)
+        faults = 0
+        for i, page_number in enumerate(pages):
+            self.position += counts[i] - 1
+            if any_write[i]:
+                fault = self.write_memory(page_number)
+            else:
+                fault = self.read_memory(page_number)
+            if fault:
+                faults += 1
+        self.disk_accesses += sum(counts)
+        return faults
+
+    def get_total_disk_reads(self):
+        return self.disk_reads
+
+    def get_total_disk_writes(self):
+        return self.disk_writes
+
+    def get_total_page_faults(self):
+        return self.page_faults
+
+    def get_disk_accesses(self):
+        return self.disk_accesses
+
+    def print_page_table(self):
+        if not self.debug:
+            return
+        table = ['-'] * self.frames
+        for i, page in enumerate(self.frame_table):
+            if page != NO_PAGE:
+                table[i] = str(page)
+        print("Page Table:", " ".join(table))
+        print("-" * 40)
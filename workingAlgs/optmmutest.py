@@ -0,0 +1,33 @@
+import unittest
+from array import array
+from lrummu import LruMMU
+from optmmu import OptMMU, build_next_use, load_next_use
+from tracefile import read_trace
+
+
+class TestOptMMU(unittest.TestCase):
+    def test_textbook_reference_string(self):
+        pages = [7, 0, 1, 2, 0, 3, 0, 4, 2, 3, 0, 3, 2, 1, 2, 0, 1, 7, 0, 1]
+        mmu = OptMMU(3, build_next_use(array('q', pages)))
+        for page in pages:
+            mmu.read_memory(page)
+        self.assertEqual(mmu.get_total_page_faults(), 9)
+
+    def test_never_worse_than_lru(self):
+        for trace in ("trace1", "trace2", "trace3", "sample.trace"):
+            accesses = list(read_trace(trace))
+            next_use = load_next_use(trace)
+            for frames in (1, 2, 4, 8):
+                opt = OptMMU(frames, next_use)
+                lru = LruMMU(frames)
+                for page_number, is_write in accesses:
+                    for mmu in (opt, lru):
+                        if is_write:
+                            mmu.write_memory(page_number)
+                        else:
+                            mmu.read_memory(page_number)
+                self.assertLessEqual(opt.get_total_page_faults(), lru.get_total_page_faults())
+
+
+if __name__ == '__main__':
+    unittest.main()
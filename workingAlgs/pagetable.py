@@ -0,0 +1,80 @@
+'''
+* Page -> frame table for MMUs that run on dense page ids (pages numbered
+* 0, 1, 2, ... by tracefile.PageInterner). entries is a plain list indexed
+* by page id holding the frame, or None when the page is not resident, so
+* the table costs 8 bytes per distinct page and a batch loop can look a
+* page up and map it with plain list indexing instead of hashing.
+*
+* The dict operations the MMUs use on their page table (get, in, del and
+* assignment) work the same on a DensePageTable, so read_memory and
+* write_memory need no changes. PageTableMixin gives an MMU its table and
+* hands its batch loop the lookup, map and unmap operations of either kind
+* of table, so the same loop runs on page numbers and on dense ids.
+*
+'''
+class DensePageTable:
+    __slots__ = ("entries",)
+
+    def __init__(self):
+        self.entries = []
+
+    def reserve(self, count):
+        """Make page ids below count valid indexes of entries."""
+        if count > len(self.entries):
+            self.entries.extend([None] * (count - len(self.entries)))
+
+    def get(self, page_number, default=None):
+        if page_number < len(self.entries):
+            frame = self.entries[page_number]
+            if frame is not None:
+                return frame
+        return default
+
+    def __getitem__(self, page_number):
+        frame = self.get(page_number)
+        if frame is None:
+            raise KeyError(page_number)
+        return frame
+
+    def __setitem__(self, page_number, frame):
+        self.reserve(page_number + 1)
+        self.entries[page_number] = frame
+
+    def __delitem__(self, page_number):
+        self.entries[page_number] = None
+
+    def __contains__(self, page_number):
+        return self.get(page_number) is not None
+
+
+class PageTableMixin:
+    """Page table handling shared by the MMUs that accept an interner.
+
+    With an interner (tracefile.PageInterner) pages are dense ids and the
+    table is a DensePageTable, otherwise a dict. Batch loops take their
+    table operations from _batch_table() so one loop serves both.
+    """
+    __slots__ = ("table", "interner")
+
+    def _init_page_table(self, interner=None):
+        self.interner = interner
+        self.table = {} if interner is None else DensePageTable()
+
+    def page_label(self, page_number):
+        # pages are dense ids when an interner was given
+        if self.interner is None:
+            return page_number
+        return self.interner.page_of(page_number)
+
+    def _batch_table(self):
+        """Return (table, lookup, unmap) for a batch loop.
+
+        lookup(page) gives the frame of a page or None, table[page] = frame
+        maps a page and unmap(page) removes it. With dense ids table is the
+        entries list, reserved for every id handed out so far.
+        """
+        table = self.table
+        if self.interner is None:
+            return table, table.get, table.__delitem__
+        table.reserve(len(self.interner))
+        return table.entries, table.entries.__getitem__, table.__delitem__
@@ -0,0 +1,57 @@
+from arcmmu import ArcMMU
+from clockmmu import ClockMMU
+from escmmu import EscMMU
+from lfummu import LfuMMU
+from lirsmmu import LirsMMU
+from lrummu import LruMMU
+from optmmu import OptMMU
+from randmmu import RandMMU
+from twolistmmu import TwoListMMU
+from wsclockmmu import WSClockMMU
+
+"""Replacement modes accepted by memsim and the MMU class behind each one."""
+
+POLICIES = {
+    "rand": RandMMU,
+    "lru": LruMMU,
+    "esc": EscMMU,
+    "clock": ClockMMU,
+    "opt": OptMMU,
+    "arc": ArcMMU,
+    "lirs": LirsMMU,
+    "active-inactive": TwoListMMU,
+    "lfu": LfuMMU,
+    "wsclock": WSClockMMU,
+}
+
+# modes whose MMUs can run on dense page ids (see tracefile.PageInterner)
+DENSE_POLICIES = ("rand", "lru", "esc", "clock", "wsclock")
+
+
+def create_mmu(replacement_mode, frames, next_use=None, interner=None, seed=None,
+               lfu_aging=None, wsclock_tau=None):
+    """Return a new MMU for a replacement mode.
+
+    opt is an offline policy and needs the next use array of the trace
+    (see optmmu.build_next_use). With an interner the MMU is fed dense page
+    ids from it instead of page numbers. seed seeds the victim choice of
+    rand; the other policies make no random choices and ignore it.
+    lfu_aging is the aging interval of lfu (see LfuMMU) and wsclock_tau the
+    working set window of wsclock (see WSClockMMU).
+    """
+    if replacement_mode not in POLICIES:
+        raise ValueError(f"Invalid replacement mode '{replacement_mode}'")
+    if replacement_mode == "opt" and interner is None:
+        return OptMMU(frames, next_use)
+    options = {}
+    if interner is not None:
+        if replacement_mode not in DENSE_POLICIES:
+            raise ValueError(f"Dense page ids are only supported by [{', '.join(DENSE_POLICIES)}]")
+        options["interner"] = interner
+    if replacement_mode == "rand":
+        options["seed"] = seed
+    if replacement_mode == "lfu":
+        options["aging_interval"] = lfu_aging
+    if replacement_mode == "wsclock":
+        options["tau"] = wsclock_tau
+    return POLICIES[replacement_mode](frames, **options)
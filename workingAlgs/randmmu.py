@@ -1,22 +1,38 @@
-from mmu import MMU    # keep if the skeleton expects subclassing
+from mmu import MMU, NO_PAGE    # keep if the skeleton expects subclassing
+from framepool import FreeFramePool
+from pagetable import PageTableMixin
+from tracefile import open_trace
+from array import array
 import random
 import sys
 
-class RandMMU(MMU):
+class RandMMU(PageTableMixin, MMU):
     PAGE_SIZE = 4096  # 4 KB pages
+    VICTIM_BLOCK = 4096  # victim frames drawn at a time
 
-    def __init__(self, frames, debug=False):
+    __slots__ = ("frames", "debug", "frame_table", "free_frames", "seed", "rng", "victims",
+                 "dirty_bits", "page_faults", "disk_reads", "disk_writes", "disk_accesses")
+
+    def __init__(self, frames, debug=False, interner=None, seed=None):
         self.frames = frames
         self.debug = debug
 
-        # frame -> page mapping
-        self.frame_table = [None] * frames
+        # frame -> page mapping (NO_PAGE when empty)
+        self.frame_table = array('q', [NO_PAGE]) * frames
+        self.free_frames = FreeFramePool(frames)
+
+        # page -> frame mapping (see PageTableMixin)
+        self._init_page_table(interner)
 
-        # page -> frame mapping
-        self.table = {}
+        # victims come from a generator of our own, so a seed reproduces a
+        # run; without one the seed is taken from the random module, so
+        # random.seed() still makes runs repeatable
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.rng = random.Random(self.seed)
+        self.victims = iter(())
 
-        # set of pages currently marked dirty
-        self.dirty_pages = set()
+        # dirty bit per frame
+        self.dirty_bits = bytearray(frames)
 
         # stats
         self.page_faults = 0
@@ -40,52 +56,63 @@ class RandMMU(MMU):
         self.frame_table[frame] = page_number
 
     def is_frame_empty(self, frame):
-        return self.frame_table[frame] is None
+        return self.frame_table[frame] == NO_PAGE
 
     def get_frame_content(self, frame):
-        return self.frame_table[frame]
+        page_number = self.frame_table[frame]
+        return None if page_number == NO_PAGE else page_number
 
     def set_frame_content(self, frame, content):
         old = self.frame_table[frame]
-        if old is not None and old in self.table:
+        if old != NO_PAGE and old in self.table:
             del self.table[old]
-        self.frame_table[frame] = content
+        self.frame_table[frame] = NO_PAGE if content is None else content
         if content is not None:
             self.table[content] = frame
 
+    def _draw_victims(self):
+        # VICTIM_BLOCK random 64-bit numbers in one call, reduced mod frames
+        # (the bias is at most frames / 2^64), so each eviction only has to
+        # take the next one
+        numbers = array('Q', self.rng.randbytes(8 * self.VICTIM_BLOCK))
+        return iter(list(map(self.frames.__rmod__, numbers)))
+
     # internal helper to find free frame or evict randomly
     def _allocate_frame_for(self, page_number):
         # find a free frame
-        for idx, occupant in enumerate(self.frame_table):
-            if occupant is None:
-                return idx
+        frame = self.free_frames.allocate()
+        if frame is not None:
+            return frame
 
         # no free frame: evict a random frame
-        victim_frame = random.randrange(self.frames)
+        victim_frame = next(self.victims, None)
+        if victim_frame is None:
+            self.victims = self._draw_victims()
+            victim_frame = next(self.victims)
         victim_page = self.frame_table[victim_frame]
 
         if self.debug:
-            print(f"Evicting page {victim_page} from frame {victim_frame}")
+            print(f"Evicting page {self.page_label(victim_page)} from frame {victim_frame}")
 
         # write back if dirty
-        if victim_page in self.dirty_pages:
+        if self.dirty_bits[victim_frame]:
             self.disk_writes += 1
-            self.dirty_pages.remove(victim_page)
+            self.dirty_bits[victim_frame] = 0
             if self.debug:
-                print(f"Writing dirty page {victim_page} to disk (disk_writes={self.disk_writes})")
+                print(f"Writing dirty page {self.page_label(victim_page)} to disk (disk_writes={self.disk_writes})")
 
         # remove old mapping
         if victim_page in self.table:
             del self.table[victim_page]
 
-        self.frame_table[victim_frame] = None  # free the frame
+        self.frame_table[victim_frame] = NO_PAGE  # free the frame
         return victim_frame
 
     # simulate read access
     def read_memory(self, page_number):
         if page_number in self.table:
             if self.debug:
-                print(f"Read hit: page {page_number} in frame {self.table[page_number]}")
+                print(f"Read hit: page {self.page_label(page_number)} in frame {self.table[page_number]}")
                 print("="*50 + "\n")
             return False  # HIT
 
@@ -100,7 +127,7 @@ class RandMMU(MMU):
         self.table[page_number] = frame
 
         if self.debug:
-            print(f"Read miss: loading page {page_number} into frame {frame} (disk_reads={self.disk_reads})")
+            print(f"Read miss: loading page {self.page_label(page_number)} into frame {frame} (disk_reads={self.disk_reads})")
             print("="*50 + "\n")
 
 
@@ -108,10 +135,11 @@ class RandMMU(MMU):
 
     # simulate write access
     def write_memory(self, page_number):
-        if page_number in self.table:
-            self.dirty_pages.add(page_number)
+        frame = self.table.get(page_number)
+        if frame is not None:
+            self.dirty_bits[frame] = 1
             if self.debug:
-                print(f"Write hit: marked page {page_number} dirty in frame {self.table[page_number]}")
+                print(f"Write hit: marked page {self.page_label(page_number)} dirty in frame {frame}")
                 print("="*50 + "\n")
             return False  # HIT
 
@@ -124,15 +152,56 @@ class RandMMU(MMU):
         # install mapping and mark dirty
         self.frame_table[frame] = page_number
         self.table[page_number] = frame
-        self.dirty_pages.add(page_number)
+        self.dirty_bits[frame] = 1
 
         if self.debug:
-            print(f"Write miss: loading page {page_number} into frame {frame} (disk_reads={self.disk_reads})")
+            print(f"Write miss: loading page {self.page_label(page_number)} into frame {frame} (disk_reads={self.disk_reads})")
             print("="*50 + "\n")
 
         return True
 
+    # simulate a batch of accesses (see MMU.access_batch)
+    def access_batch(self, pages, is_write, fault_bitmap=None):
+        if self.debug:
+            return MMU.access_batch(self, pages, is_write, fault_bitmap)
+
+        # local names keep attribute lookups out of the loop
+        table, lookup, _ = self._batch_table()
+        frame_table = self.frame_table
+        dirty_bits = self.dirty_bits
+        allocate = self._allocate_frame_for
+        faults = 0
+        for i, page_number in enumerate(pages):
+            frame = lookup(page_number)
+            if frame is None:
+                # PAGE FAULT
+                faults += 1
+                if fault_bitmap is not None:
+                    fault_bitmap[i >> 3] |= 1 << (i & 7)
+                frame = allocate(page_number)
+                frame_table[frame] = page_number
+                table[page_number] = frame
+            if is_write[i]:
+                dirty_bits[frame] = 1
+
+        self.page_faults += faults
+        self.disk_reads += faults
+        self.disk_accesses += len(pages)
+        return faults
+
+    # simulate a batch of collapsed runs (see MMU.access_runs); hits do
+    # not change any state, so a run is one access
+    def access_runs(self, pages, counts, any_write):
+        if self.debug:
+            return MMU.access_runs(self, pages, counts, any_write)
+        faults = self.access_batch(pages, any_write)
+        self.disk_accesses += sum(counts) - len(pages)
+        return faults
+
     # stats getters
+    def get_report(self):
+        return [f"random seed: {self.seed}"]
+
     def get_total_disk_reads(self):
         return self.disk_reads
     
@@ -151,8 +220,8 @@ class RandMMU(MMU):
             return
         table = ['-'] * self.frames
         for i, page in enumerate(self.frame_table):
-            if page is not None:
-                table[i] = str(page)
+            if page != NO_PAGE:
+                table[i] = str(self.page_label(page))
         print("Page Table:", " ".join(table))
         print("-" * 40)
 
@@ -168,7 +237,7 @@ def run_trace_file(filename, mmu, debug=False):
         print(f"Running trace from {filename}")
         print("="*50 + "\n")
 
-    with open(filename, 'r') as f:
+    with open_trace(filename, text=True) as f:
         step_num = 1
         for line in f:
             line = line.strip()
@@ -33,5 +33,38 @@ class TestRandMMU(unittest.TestCase):
         print("Disk Reads:", self.rand_mmu.get_total_disk_reads())
         print("Disk Writes:", self.rand_mmu.get_total_disk_writes())
 
+
+class TestRandSeed(unittest.TestCase):
+    def run_trace(self, mmu, pages, writes):
+        for page_number, is_write in zip(pages, writes):
+            if is_write:
+                mmu.write_memory(page_number)
+            else:
+                mmu.read_memory(page_number)
+        return (mmu.get_total_page_faults(), mmu.get_total_disk_writes(),
+                list(mmu.frame_table))
+
+    def test_same_seed_same_run(self):
+        rng = random.Random(5)
+        pages = [rng.randrange(40) for _ in range(20000)]
+        writes = [rng.random() < 0.3 for _ in range(20000)]
+        first = self.run_trace(RandMMU(8, seed=42), pages, writes)
+        # the global generator must not matter once a seed is given
+        random.seed(1)
+        self.assertEqual(self.run_trace(RandMMU(8, seed=42), pages, writes), first)
+        # batches draw the same victims as single accesses
+        batched = RandMMU(8, seed=42)
+        batched.access_batch(pages, bytes(writes))
+        self.assertEqual((batched.get_total_page_faults(), batched.get_total_disk_writes(),
+                          list(batched.frame_table)), first)
+        self.assertNotEqual(self.run_trace(RandMMU(8, seed=43), pages, writes), first)
+
+    def test_victims_in_range(self):
+        mmu = RandMMU(7, seed=3)
+        victims = list(mmu._draw_victims())
+        self.assertEqual(len(victims), RandMMU.VICTIM_BLOCK)
+        self.assertEqual(set(victims), set(range(7)))
+
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
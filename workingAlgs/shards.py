@@ -0,0 +1,176 @@
+from cli import get_float_option, get_int_option, to_int
+from stackdist import lru_profile_file
+from tracefile import iter_trace_blocks
+
+from bisect import bisect_left
+import heapq
+import math
+import sys
+
+"""SHARDS: approximate LRU miss ratio curves from a spatially sampled
+trace (Waldspurger et al., FAST '15).
+
+A page is sampled when hash(page) < threshold, out of HASH_RANGE, so the
+sampling rate is R = threshold / HASH_RANGE and every access to a sampled
+page is kept. Stack distances are computed among the sampled pages only;
+a sampled distance d stands for about 1 + (d - 1) / R distinct pages in
+the full trace, and each sampled access stands for 1 / R accesses.
+
+With a fixed rate the sample set grows with the number of distinct pages.
+With a sample size limit (fixed-size SHARDS) the threshold is lowered to
+the largest sampled hash whenever the limit is exceeded, and the pages
+with that hash leave the sample, so memory stays O(sample_size) however
+many pages the trace touches. Accesses are weighted by 1 / R at the time
+they are seen.
+
+In fixed rate mode the histogram is corrected as in SHARDS-adj: the gap
+between the expected number of sampled accesses (events * R) and the
+actual number is added to the smallest distance bucket.
+"""
+
+HASH_BITS = 24
+HASH_RANGE = 1 << HASH_BITS
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15   # 2^64 / golden ratio
+HASH_MASK = (1 << 64) - 1
+HASH_SHIFT = 64 - HASH_BITS
+
+
+def page_hash(page_number):
+    """Spread page numbers uniformly over [0, HASH_RANGE)."""
+    return ((page_number * HASH_MULTIPLIER) & HASH_MASK) >> HASH_SHIFT
+
+
+def shards_profile(pages, max_frames, rate=0.01, sample_size=None):
+    """Estimate the LRU miss ratio for every frame count from 1 to max_frames.
+
+    pages is an iterable of page numbers. sample_size, if given, bounds the
+    number of sampled pages. Returns (events, rows, final_rate) where rows
+    holds (frames, miss_ratio) for frames = 1..max_frames.
+    """
+    if not 0 < rate <= 1:
+        raise ValueError("Sampling rate must be in (0, 1]")
+    if sample_size is not None and sample_size < 1:
+        raise ValueError("Sample size must be at least 1")
+
+    threshold = max(1, int(rate * HASH_RANGE))
+    beyond = max_frames + 1
+    weights = [0.0] * (beyond + 1)     # estimated accesses per full size distance
+    total = 0.0
+
+    last_time = {}      # sampled page -> time of its latest access
+    times = []          # latest access times of the sampled pages, sorted
+    by_hash = []        # max-heap of (-hash, page) over the sampled pages
+
+    events = 0
+    for page_number in pages:
+        events += 1
+        page_hashed = ((page_number * HASH_MULTIPLIER) & HASH_MASK) >> HASH_SHIFT
+        if page_hashed >= threshold:
+            continue
+        scale = HASH_RANGE / threshold      # 1 / R
+        total += scale
+
+        previous = last_time.get(page_number)
+        if previous is None:
+            weights[beyond] += scale        # cold miss at every size
+            if sample_size is not None:
+                heapq.heappush(by_hash, (-page_hashed, page_number))
+        else:
+            # every sampled page used after `previous` is distinct
+            index = bisect_left(times, previous)
+            distance = len(times) - index
+            del times[index]
+            full_distance = math.ceil(1 + (distance - 1) * scale)
+            weights[min(full_distance, beyond)] += scale
+        times.append(events)
+        last_time[page_number] = events
+
+        if sample_size is not None and len(last_time) > sample_size:
+            # lower the threshold to the largest sampled hash and drop
+            # every page with that hash from the sample
+            threshold = -by_hash[0][0]
+            while by_hash and -by_hash[0][0] >= threshold:
+                _, dropped = heapq.heappop(by_hash)
+                del times[bisect_left(times, last_time.pop(dropped))]
+
+    if sample_size is None and events:
+        # SHARDS-adj: account for the sampled set being larger or smaller
+        # than its expected share of the accesses
+        weights[1] += events - total
+        total = events
+
+    rows = []
+    misses = sum(weights[2:])   # misses with one frame
+    for frames in range(1, max_frames + 1):
+        ratio = misses / total if total > 0 else 0.0
+        rows.append((frames, min(max(ratio, 0.0), 1.0)))
+        misses -= weights[frames + 1]
+    return events, rows, threshold / HASH_RANGE
+
+
+def shards_profile_file(filename, max_frames, rate=0.01, sample_size=None):
+    pages = (page_number for block_pages, _ in iter_trace_blocks(filename)
+             for page_number in block_pages)
+    return shards_profile(pages, max_frames, rate, sample_size)
+
+
+def compare_with_exact(filename, max_frames, rate=0.01, sample_size=None):
+    """Return (mean, max) absolute miss ratio error against stackdist."""
+    events, rows, _ = shards_profile_file(filename, max_frames, rate, sample_size)
+    _, exact_rows = lru_profile_file(filename, max_frames)
+    if events == 0:
+        return 0.0, 0.0
+    errors = [abs(ratio - faults / events)
+              for (_, ratio), (_, faults, _) in zip(rows, exact_rows)]
+    return sum(errors) / len(errors), max(errors)
+
+
+def print_profile(events, rows, final_rate, exact_rows=None):
+    print(f"events in trace: {events}")
+    print(f"sampling rate: {final_rate:.6f}")
+    header = f"{'frames':>8} {'est. reads':>12} {'fault rate':>11}"
+    if exact_rows is not None:
+        header += f" {'exact rate':>11} {'error':>8}"
+    print(header)
+    errors = []
+    for i, (frames, ratio) in enumerate(rows):
+        line = f"{frames:>8} {round(ratio * events):>12} {ratio:>11.4f}"
+        if exact_rows is not None:
+            exact = exact_rows[i][1] / events if events > 0 else 0.0
+            errors.append(abs(ratio - exact))
+            line += f" {exact:>11.4f} {ratio - exact:>+8.4f}"
+        print(line)
+    if errors:
+        print(f"mean absolute error: {sum(errors) / len(errors):.4f}")
+        print(f"max absolute error: {max(errors):.4f}")
+
+
+# -------------------------------------------------
+# CLI Entry
+# -------------------------------------------------
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python3 shards.py <trace_file> <max_frames> "
+              "[--rate R] [--size S] [--exact]")
+        sys.exit(1)
+
+    options = sys.argv[3:]
+    try:
+        max_frames = to_int(sys.argv[2], "max_frames", minimum=1)
+        size = get_int_option(options, "--size")
+        # a fixed size sample starts with every page and lowers the rate as needed
+        default_rate = 0.01 if size is None else 1.0
+        rate = get_float_option(options, "--rate", default_rate)
+
+        events, rows, final_rate = shards_profile_file(sys.argv[1], max_frames, rate, size)
+        exact_rows = None
+        if "--exact" in options:
+            _, exact_rows = lru_profile_file(sys.argv[1], max_frames)
+    except FileNotFoundError:
+        print(f"Input '{sys.argv[1]}' could not be found")
+        sys.exit(1)
+    except ValueError as err:
+        print(err)
+        sys.exit(1)
+
+    print_profile(events, rows, final_rate, exact_rows)
@@ -0,0 +1,47 @@
+import random
+import unittest
+from shards import compare_with_exact, page_hash, shards_profile, HASH_RANGE
+from stackdist import lru_profile
+
+
+class TestShards(unittest.TestCase):
+    def test_full_sample_is_exact(self):
+        for trace in ("trace1", "trace2", "trace3", "sample.trace"):
+            self.assertEqual(compare_with_exact(trace, 16, rate=1.0), (0.0, 0.0))
+            # a sample size above the page count never lowers the rate
+            self.assertEqual(compare_with_exact(trace, 16, rate=1.0, sample_size=1000),
+                             (0.0, 0.0))
+
+    def test_fixed_size_bounds_the_sample(self):
+        pages = list(range(5000)) * 2
+        events, rows, final_rate = shards_profile(pages, 10, rate=1.0, sample_size=100)
+        self.assertEqual(events, 10000)
+        sampled = sum(1 for page_number in range(5000)
+                      if page_hash(page_number) < final_rate * HASH_RANGE)
+        self.assertLessEqual(sampled, 100)
+        # a cyclic scan larger than memory misses every time
+        self.assertEqual([ratio for _, ratio in rows], [1.0] * 10)
+
+    def test_sampled_curve_is_close(self):
+        rng = random.Random(7)
+        accesses = []
+        for _ in range(60000):
+            # a hot set of 200 pages and a long tail of 20000
+            page_number = rng.randrange(200) if rng.random() < 0.8 else rng.randrange(20000)
+            accesses.append((page_number, 0))
+        events, exact_rows = lru_profile(accesses, 1000)
+        _, rows, _ = shards_profile([page for page, _ in accesses], 1000, rate=0.1)
+        # sizes below 1 / R cannot be resolved by the sample
+        errors = [abs(ratio - faults / events)
+                  for (frames, ratio), (_, faults, _) in zip(rows, exact_rows) if frames >= 10]
+        self.assertLess(max(errors), 0.05)
+
+    def test_bad_parameters(self):
+        with self.assertRaises(ValueError):
+            shards_profile([1, 2], 4, rate=0)
+        with self.assertRaises(ValueError):
+            shards_profile([1, 2], 4, rate=1.0, sample_size=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
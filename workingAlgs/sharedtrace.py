@@ -0,0 +1,98 @@
+from optmmu import build_next_use
+from tracefile import is_binary_trace, iter_trace_blocks, open_trace, read_binary_header
+from multiprocessing import shared_memory
+
+"""A decoded trace placed once in shared memory so several processes can
+simulate it without each holding a copy.
+
+The block holds, in order:
+    pages     count int64 page numbers
+    next_use  count int64 next use positions (only when built, for opt)
+    writes    count bytes, 1 for a write and 0 for a read
+The creating process decodes the trace straight into the block, so the
+trace is never held twice. Workers attach by name and get memoryviews into
+the block (no copies).
+"""
+
+
+def count_events(filename):
+    """Count the events in a trace without decoding it."""
+    if is_binary_trace(filename):
+        with open(filename, 'rb') as trace_file:
+            return read_binary_header(trace_file, filename)[1]
+    count = 0
+    last = b'\n'
+    with open_trace(filename) as trace_file:
+        while True:
+            chunk = trace_file.read(1 << 20)
+            if not chunk:
+                break
+            count += chunk.count(b'\n')
+            last = chunk[-1:]
+    return count + (last != b'\n')
+
+
+class SharedTrace:
+    def __init__(self, shm, count, has_next_use, owner):
+        self.shm = shm
+        self.count = count
+        self.has_next_use = has_next_use
+        self.owner = owner      # the creator unlinks the block
+
+        view = shm.buf
+        pages_end = 8 * count
+        writes_start = pages_end * (2 if has_next_use else 1)
+        self.pages = view[:pages_end].cast('q')
+        self.next_use = view[pages_end:writes_start].cast('q') if has_next_use else None
+        self.writes = view[writes_start:writes_start + count]
+
+    @classmethod
+    def from_file(cls, filename, with_next_use=False):
+        """Decode a trace file into a new shared memory block."""
+        count = count_events(filename)
+        size = count * (17 if with_next_use else 9)
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        trace = cls(shm, count, with_next_use, owner=True)
+        try:
+            position = 0
+            for pages, writes in iter_trace_blocks(filename):
+                end = position + len(pages)
+                if end > count:
+                    raise ValueError(f"'{filename}' changed while it was being read")
+                trace.pages[position:end] = memoryview(pages)
+                trace.writes[position:end] = writes
+                position = end
+            if with_next_use:
+                build_next_use(trace.pages, trace.next_use)
+        except BaseException:
+            trace.close()
+            raise
+        return trace
+
+    @classmethod
+    def attach(cls, name, count, has_next_use):
+        """Attach to a block created by another process."""
+        # pool workers share the creator's resource tracker, so attaching
+        # registers the same name again and the creator's unlink clears it
+        shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, count, has_next_use, owner=False)
+
+    def handle(self):
+        """Arguments for attach() in another process."""
+        return self.shm.name, self.count, self.has_next_use
+
+    def close(self):
+        """Release the views; the creator also frees the block."""
+        self.pages.release()
+        if self.next_use is not None:
+            self.next_use.release()
+        self.writes.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,152 @@
+from tracefile import read_trace
+
+import sys
+
+"""Mattson stack distance analysis: one pass over a trace gives the LRU
+results for every memory size at once.
+
+LRU has the inclusion property: the pages held by N frames are always a
+subset of those held by N+1 frames. An access hits with N frames exactly
+when its stack distance (1 + number of distinct pages touched since the
+last access to the same page) is at most N. Stack distances are counted
+with a Fenwick tree over access positions that marks the latest access of
+every page, so each access costs O(log n).
+
+Disk writes use the same idea. A page is written back when it is evicted
+dirty. For each page we keep the smallest frame count at which it is
+currently dirty; an access with distance d means the page was evicted for
+every frame count below d, which is a write back for the frame counts in
+[dirty_from, d). Pages still dirty at the end of the trace are settled the
+same way using the distance they had reached by then.
+"""
+
+
+class FenwickTree:
+    """Prefix sums over positions 1..size that grows on demand."""
+
+    def __init__(self, size=1024):
+        self.tree = [0] * (size + 1)
+
+    def _grow(self, position):
+        size = len(self.tree) - 1
+        while size < position:
+            # node 2*size covers (0, 2*size], i.e. the sum of the old tree;
+            # every node in between starts empty
+            total = self.prefix_sum(size)
+            self.tree.extend([0] * size)
+            size *= 2
+            self.tree[size] = total
+
+    def add(self, position, delta):
+        if position >= len(self.tree):
+            self._grow(position)
+        tree = self.tree
+        size = len(tree)
+        while position < size:
+            tree[position] += delta
+            position += position & -position
+
+    def prefix_sum(self, position):
+        tree = self.tree
+        total = 0
+        while position > 0:
+            total += tree[position]
+            position -= position & -position
+        return total
+
+
+def lru_profile(accesses, max_frames):
+    """Run LRU for every frame count from 1 to max_frames in one pass.
+
+    accesses is an iterable of (page_number, is_write). Returns
+    (events, rows) where rows holds (frames, page_faults, disk_writes) for
+    frames = 1..max_frames. Disk reads equal page faults for LRU.
+    """
+    beyond = max_frames + 1            # bucket for distances > max_frames
+    distances = [0] * (beyond + 1)     # histogram of stack distances
+    write_diff = [0] * (beyond + 1)    # difference array of write backs
+    cold_misses = 0
+
+    tree = FenwickTree()
+    last_pos = {}       # page -> position of its latest access
+    dirty_from = {}     # page -> smallest frame count at which it is dirty
+
+    events = 0
+    for page_number, is_write in accesses:
+        events += 1
+        previous = last_pos.get(page_number)
+        if previous is None:
+            cold_misses += 1
+        else:
+            # every marked position after `previous` is a distinct page
+            distance = len(last_pos) - tree.prefix_sum(previous) + 1
+            tree.add(previous, -1)
+            if distance > beyond:
+                distance = beyond
+            distances[distance] += 1
+
+            dirty = dirty_from.get(page_number)
+            if dirty is not None and dirty < distance:
+                # evicted dirty for dirty <= frames < distance
+                write_diff[dirty] += 1
+                write_diff[distance] -= 1
+                if distance == beyond:
+                    del dirty_from[page_number]
+                else:
+                    dirty_from[page_number] = distance
+
+        tree.add(events, 1)
+        last_pos[page_number] = events
+        if is_write:
+            dirty_from[page_number] = 1
+
+    # pages pushed out after their last access are evicted as well: with
+    # fewer frames than their final distance they left memory dirty
+    for page_number, dirty in dirty_from.items():
+        distance = len(last_pos) - tree.prefix_sum(last_pos[page_number]) + 1
+        if distance > beyond:
+            distance = beyond
+        if dirty < distance:
+            write_diff[dirty] += 1
+            write_diff[distance] -= 1
+
+    rows = []
+    faults = cold_misses + sum(distances[2:])   # misses with one frame
+    writes = 0
+    for frames in range(1, max_frames + 1):
+        writes += write_diff[frames]
+        rows.append((frames, faults, writes))
+        faults -= distances[frames + 1]
+    return events, rows
+
+
+def lru_profile_file(filename, max_frames):
+    return lru_profile(read_trace(filename), max_frames)
+
+
+def print_profile(events, rows):
+    print(f"events in trace: {events}")
+    print(f"{'frames':>8} {'disk reads':>12} {'disk writes':>12} {'fault rate':>11}")
+    for frames, faults, writes in rows:
+        rate = faults / events if events > 0 else 0.0
+        print(f"{frames:>8} {faults:>12} {writes:>12} {rate:>11.4f}")
+
+
+# -------------------------------------------------
+# CLI Entry
+# -------------------------------------------------
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python3 stackdist.py <trace_file> <max_frames>")
+        sys.exit(1)
+
+    try:
+        events, rows = lru_profile_file(sys.argv[1], int(sys.argv[2]))
+    except FileNotFoundError:
+        print(f"Input '{sys.argv[1]}' could not be found")
+        sys.exit(1)
+    except ValueError as err:
+        print(err)
+        sys.exit(1)
+
+    print_profile(events, rows)
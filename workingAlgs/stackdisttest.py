@@ -0,0 +1,25 @@
+import unittest
+from lrummu import LruMMU
+from stackdist import lru_profile_file
+from tracefile import read_trace
+
+
+class TestStackDistance(unittest.TestCase):
+    def test_matches_lru_at_every_size(self):
+        for trace in ("trace1", "trace2", "trace3", "sample.trace"):
+            accesses = list(read_trace(trace))
+            events, rows = lru_profile_file(trace, 16)
+            self.assertEqual(events, len(accesses))
+            for frames, faults, writes in rows:
+                mmu = LruMMU(frames)
+                for page_number, is_write in accesses:
+                    if is_write:
+                        mmu.write_memory(page_number)
+                    else:
+                        mmu.read_memory(page_number)
+                self.assertEqual(faults, mmu.get_total_page_faults(), (trace, frames))
+                self.assertEqual(writes, mmu.get_total_disk_writes(), (trace, frames))
+
+
+if __name__ == '__main__':
+    unittest.main()
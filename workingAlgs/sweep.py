@@ -0,0 +1,104 @@
+from optmmu import build_next_use
+from policies import create_mmu
+from sharedtrace import SharedTrace
+from tracefile import iter_trace_blocks
+from concurrent.futures import ProcessPoolExecutor
+from array import array
+from itertools import repeat
+
+"""Frame count sweeps: one simulation per frame count, run in a process
+pool. The trace is decoded once by the parent into shared memory (see
+sharedtrace.py); each worker attaches to it when it starts and runs its
+simulations from it with MMU.access_batch, so the trace is never copied
+per worker or per frame count.
+"""
+
+CHUNK_EVENTS = 1 << 16
+
+# shared trace attached by each worker process
+_worker_trace = None
+
+
+def parse_frame_range(text):
+    """Turn 'first:last' or 'first:last:step' into a list of frame counts.
+
+    last is included. Raises ValueError for a malformed range.
+    """
+    try:
+        parts = [int(part) for part in text.split(":")]
+    except ValueError:
+        parts = []
+    if len(parts) not in (2, 3):
+        raise ValueError(f"Invalid frame range '{text}'. Use first:last or first:last:step")
+    first, last = parts[0], parts[1]
+    step = parts[2] if len(parts) == 3 else 1
+    if first < 1 or last < first or step < 1:
+        raise ValueError("Frame number must be at least 1, and last must not be below first")
+    return list(range(first, last + 1, step))
+
+
+def load_trace(filename):
+    """Decode a whole trace into (pages array('q'), writes bytearray)."""
+    pages = array('q')
+    writes = bytearray()
+    for block_pages, block_writes in iter_trace_blocks(filename):
+        pages.frombytes(memoryview(block_pages).cast("B"))
+        writes += block_writes
+    return pages, writes
+
+
+def simulate(replacement_mode, frames, pages, writes, next_use=None, seed=None):
+    """Run one policy at one frame count over a decoded trace.
+
+    Returns (frames, disk reads, disk writes, page faults).
+    """
+    mmu = create_mmu(replacement_mode, frames, next_use, seed=seed)
+    pages = memoryview(pages)
+    writes = memoryview(writes)
+    for start in range(0, len(pages), CHUNK_EVENTS):
+        end = start + CHUNK_EVENTS
+        mmu.access_batch(pages[start:end], writes[start:end])
+    return (frames, mmu.get_total_disk_reads(), mmu.get_total_disk_writes(),
+            mmu.get_total_page_faults())
+
+
+def init_worker(handle):
+    """Pool initializer: attach to the shared trace described by handle."""
+    global _worker_trace
+    _worker_trace = SharedTrace.attach(*handle)
+
+
+def simulate_in_worker(replacement_mode, frames, seed=None):
+    """Run simulate on the trace attached by init_worker."""
+    trace = _worker_trace
+    return simulate(replacement_mode, frames, trace.pages, trace.writes, trace.next_use, seed)
+
+
+def run_sweep(filename, replacement_mode, frame_counts, jobs, seed=None):
+    """Simulate every frame count; returns (events, rows) in frame order.
+
+    seed seeds rand (see create_mmu) at every frame count.
+    """
+    with_next_use = replacement_mode == "opt"
+    if jobs <= 1 or len(frame_counts) == 1:
+        pages, writes = load_trace(filename)
+        next_use = build_next_use(pages) if with_next_use else None
+        rows = [simulate(replacement_mode, frames, pages, writes, next_use, seed)
+                for frames in frame_counts]
+        return len(pages), rows
+
+    with SharedTrace.from_file(filename, with_next_use) as trace:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(frame_counts)),
+                                 initializer=init_worker,
+                                 initargs=(trace.handle(),)) as pool:
+            rows = list(pool.map(simulate_in_worker, repeat(replacement_mode), frame_counts,
+                                 repeat(seed)))
+        return trace.count, rows
+
+
+def print_sweep(events, rows):
+    print(f"events in trace: {events}")
+    print(f"{'frames':>8} {'disk reads':>12} {'disk writes':>12} {'fault rate':>11}")
+    for frames, reads, writes, faults in rows:
+        rate = faults / events if events > 0 else 0.0
+        print(f"{frames:>8} {reads:>12} {writes:>12} {rate:>11.4f}")
@@ -0,0 +1,38 @@
+import unittest
+from stackdist import lru_profile_file
+from optmmu import build_next_use
+from sharedtrace import SharedTrace
+from sweep import load_trace, parse_frame_range, run_sweep
+
+
+class TestSweep(unittest.TestCase):
+    def test_parse_frame_range(self):
+        self.assertEqual(parse_frame_range("1:4"), [1, 2, 3, 4])
+        self.assertEqual(parse_frame_range("2:10:4"), [2, 6, 10])
+        for bad in ("0:4", "4:1", "1:4:0", "1", "a:b", "1:2:3:4"):
+            with self.assertRaises(ValueError):
+                parse_frame_range(bad)
+
+    def test_lru_sweep_matches_stack_distances(self):
+        events, expected = lru_profile_file("trace3", 8)
+        for jobs in (1, 2):
+            swept_events, rows = run_sweep("trace3", "lru", parse_frame_range("1:8"), jobs)
+            self.assertEqual(swept_events, events)
+            self.assertEqual([(frames, faults, writes) for frames, _, writes, faults in rows],
+                             expected)
+
+    def test_shared_trace_matches_loaded_trace(self):
+        pages, writes = load_trace("trace3")
+        with SharedTrace.from_file("trace3", with_next_use=True) as trace:
+            self.assertEqual(list(trace.pages), list(pages))
+            self.assertEqual(bytes(trace.writes), bytes(writes))
+            self.assertEqual(list(trace.next_use), list(build_next_use(pages)))
+
+    def test_opt_sweep_in_workers_matches_serial(self):
+        frame_counts = parse_frame_range("1:6")
+        self.assertEqual(run_sweep("trace3", "opt", frame_counts, 2),
+                         run_sweep("trace3", "opt", frame_counts, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,398 @@
+'''
+* Trace file reading shared by the simulators and analysis tools.
+* A trace line is "<hex address> <R|W>"; the page number is the address
+* shifted right by PAGE_OFFSET bits.
+*
+* Traces are decoded a block at a time into an array('q') of page numbers
+* and a bytes object of write flags (1 for W, 0 for R). Most traces use
+* fixed width lines ("0001f000 R"), and those blocks are decoded with
+* slicing, bytes.fromhex and array, with no per-line Python code. Other
+* blocks are split once and the tokens converted together, and blocks that
+* do not split into address and R/W pairs (extra spaces or fields, bad
+* lines) are parsed line by line with the rules of the original parser.
+*
+* PageInterner maps page numbers to dense ids for the list indexed page
+* tables (see pagetable.py).
+*
+* collapse_runs turns a block into runs of consecutive accesses to one
+* page, for MMU.access_runs.
+*
+* Text traces may be gzip, bzip2 or xz compressed; open_trace detects this
+* from the magic bytes and decompresses while reading.
+*
+* Binary traces (see convert_to_binary) skip decoding altogether: the file
+* is memory mapped and the page array is used in place.
+*   header  magic "PGTRACE\\0", version (u16), page offset (u16),
+*           reserved (u32), event count (u64)            -- 24 bytes
+*   pages   event count little endian int64 page numbers
+*   writes  bitmap, bit i % 8 of byte i // 8 set when event i is a write
+*
+'''
+from array import array
+from itertools import groupby, repeat
+import bz2
+import gzip
+import io
+import lzma
+import mmap
+import os
+import struct
+import sys
+
+PAGE_OFFSET = 12  # page is 2^12 = 4KB
+BLOCK_SIZE = 1 << 20
+
+BINARY_MAGIC = b'PGTRACE\0'
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct('<8sHHIQ')
+
+COMPRESSED_FORMATS = [
+    (b'\x1f\x8b', gzip.open),
+    (b'BZh', bz2.open),
+    (b'\xfd7zXZ\x00', lzma.open),
+]
+
+HEX_DIGITS = b'0123456789abcdefABCDEF'
+RW_FLAGS = bytes.maketrans(b'RW', b'\x00\x01')
+OTHER_WHITESPACE = b'\t\r\x0b\x0c'    # what bytes.split() splits on besides space and newline
+
+
+def _decode_lines(data, first_line, page_offset):
+    """Decode a block line by line with the rules of the original parser.
+
+    A line is stripped and split on single spaces; the first field is a
+    hex address and the second is R or W. Any further fields are ignored.
+    """
+    lines = data.split(b'\n')
+    if data.endswith(b'\n'):
+        lines.pop()
+    pages = array('q')
+    writes = bytearray()
+    for line_no, trace_line in enumerate(lines, first_line):
+        trace_cmd = trace_line.strip().split(b" ")
+        try:
+            if len(trace_cmd) < 2 or trace_cmd[1] not in (b"R", b"W"):
+                raise ValueError
+            pages.append(int(trace_cmd[0], 16) >> page_offset)
+        except ValueError:
+            raise ValueError(f"Badly formatted file. Error on line {line_no}")
+        writes.append(trace_cmd[1] == b"W")
+    return pages, bytes(writes)
+
+
+def _decode_fixed_width(data, page_offset):
+    """Decode a block of equal length lines, or return None if it is not one."""
+    width = data.find(b'\n') + 1
+    digits = width - 3                  # "<address> <R|W>\n"
+    if digits < 1 or len(data) % width or page_offset % 4:
+        return None
+    count = len(data) // width
+    if (data.count(b'\n') != count or data[width - 1::width].count(b'\n') != count
+            or data[digits::width].count(b' ') != count):
+        return None
+    for column in range(digits):
+        if data[column::width].translate(None, HEX_DIGITS):
+            return None
+
+    page_digits = digits - page_offset // 4
+    if page_digits > 15:
+        return None
+    # gather the page digits of every line into 16 digit big endian words
+    words = bytearray(b'0') * (16 * count)
+    for column in range(max(page_digits, 0)):
+        words[16 - page_digits + column::16] = data[column::width]
+    pages = array('q', bytes.fromhex(words.decode('ascii')))
+    if sys.byteorder == 'little':
+        pages.byteswap()
+
+    flags = data[digits + 1::width]
+    writes = flags.translate(RW_FLAGS)
+    if writes.translate(None, b'\x00\x01'):
+        return None
+    return pages, writes
+
+
+def decode_block(data, first_line=1, page_offset=PAGE_OFFSET):
+    """Decode whole trace lines into (pages, writes).
+
+    first_line is the line number of the first line in data, used in the
+    "Badly formatted file" error.
+    """
+    decoded = _decode_fixed_width(data, page_offset)
+    if decoded is not None:
+        return decoded
+
+    # "<address> <R|W>" on every line: convert all the tokens at once. Every
+    # line must end in " R" or " W" with no other space or whitespace on it,
+    # so a tab or a doubled space on one line cannot be offset by another
+    if not data.endswith(b'\n'):
+        data += b'\n'
+    tokens = data.split()
+    lines = data.count(b'\n')
+    flags = b''.join(tokens[1::2])
+    if (len(tokens) == 2 * lines and data.count(b' ') == lines
+            and data.count(b' R\n') + data.count(b' W\n') == lines
+            and len(data.translate(None, OTHER_WHITESPACE)) == len(data)
+            and len(flags) == lines):
+        try:
+            pages = array('q', [int(address, 16) >> page_offset for address in tokens[0::2]])
+            return pages, flags.translate(RW_FLAGS)
+        except ValueError:
+            pass
+    # anything else (extra spaces or fields, or a bad line) goes line by line
+    return _decode_lines(data, first_line, page_offset)
+
+
+def pack_writes(writes):
+    """Pack a multiple of 8 write flags (bytes of 0/1) into a bitmap."""
+    packed = 0
+    for bit in range(8):
+        # every byte of the column is 0 or 1, so shifting the whole column
+        # moves each flag to `bit` within its own byte
+        packed |= int.from_bytes(writes[bit::8], 'little') << bit
+    return packed.to_bytes(len(writes) // 8, 'little')
+
+
+def unpack_writes(bitmap):
+    """Expand a bitmap into one byte (0 or 1) per event."""
+    size = len(bitmap)
+    packed = int.from_bytes(bitmap, 'little')
+    ones = int.from_bytes(b'\x01' * size, 'little')
+    writes = bytearray(8 * size)
+    for bit in range(8):
+        writes[bit::8] = ((packed >> bit) & ones).to_bytes(size, 'little')
+    return bytes(writes)
+
+
+def collapse_runs(pages, writes):
+    """Collapse runs of consecutive accesses to the same page.
+
+    Returns (run_pages, counts, any_write): run i is counts[i] accesses to
+    run_pages[i], and any_write[i] is 1 when at least one of them is a write.
+    """
+    run_pages = array('q')
+    counts = array('q')
+    any_write = bytearray()
+    start = 0
+    for page_number, run in groupby(pages):
+        end = start + len(list(run))
+        run_pages.append(page_number)
+        counts.append(end - start)
+        any_write.append(1 in writes[start:end])
+        start = end
+    return run_pages, counts, any_write
+
+
+class PageInterner:
+    """Give page numbers dense ids 0, 1, 2, ... in order of first use.
+
+    intern() can be called block by block while streaming a trace, or
+    once on a whole decoded trace; ids stay the same across calls.
+
+    The ids dict costs about 115 bytes per distinct page, as much as the
+    page -> frame dict it lets the MMUs drop, so --dense makes lookups
+    faster but does not make a large simulation smaller.
+    """
+
+    def __init__(self):
+        self.ids = {}               # page number -> id
+        self.pages = array('q')     # id -> page number
+
+    def __len__(self):
+        return len(self.pages)
+
+    def intern(self, pages):
+        """Return the list of ids of a block of page numbers."""
+        ids = list(map(self.ids.get, pages, repeat(-1)))
+        # only pages not seen before need Python code; list.index finds
+        # them without looking at the others
+        position = 0
+        try:
+            while True:
+                position = ids.index(-1, position)
+                page_number = pages[position]
+                page_id = self.ids.get(page_number)
+                if page_id is None:
+                    page_id = len(self.pages)
+                    self.ids[page_number] = page_id
+                    self.pages.append(page_number)
+                ids[position] = page_id
+        except ValueError:
+            pass
+        return ids
+
+    def page_of(self, page_id):
+        """The original page number of an id."""
+        return self.pages[page_id]
+
+
+def open_trace(filename, text=False):
+    """Open a trace for reading, decompressing it if needed.
+
+    Returns a binary file object, or a text one when text is True.
+    """
+    with open(filename, 'rb') as trace_file:
+        magic = trace_file.read(8)
+    trace_file = None
+    for prefix, opener in COMPRESSED_FORMATS:
+        if magic.startswith(prefix):
+            trace_file = io.BufferedReader(opener(filename, 'rb'), buffer_size=BLOCK_SIZE)
+            break
+    if trace_file is None:
+        trace_file = open(filename, 'rb', buffering=BLOCK_SIZE)
+    if text:
+        return io.TextIOWrapper(trace_file)
+    return trace_file
+
+
+def is_binary_trace(filename):
+    with open(filename, 'rb') as trace_file:
+        return trace_file.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+def convert_to_binary(text_filename, binary_filename, page_offset=PAGE_OFFSET):
+    """Convert a text trace into the binary format. Returns the event count."""
+    count = 0
+    bitmap = bytearray()
+    pending = b''       # write flags not yet packed (fewer than 8)
+    with open(binary_filename, 'wb') as out:
+        out.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, page_offset, 0, 0))
+        for pages, writes in iter_trace_blocks(text_filename, page_offset):
+            if sys.byteorder != 'little':
+                pages = array('q', pages)
+                pages.byteswap()
+            out.write(pages)
+            count += len(pages)
+            pending += writes
+            whole = len(pending) - len(pending) % 8
+            bitmap += pack_writes(pending[:whole])
+            pending = pending[whole:]
+        if pending:
+            bitmap += pack_writes(pending + bytes(8 - len(pending)))
+        out.write(bitmap)
+        out.seek(0)
+        out.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, page_offset, 0, count))
+    return count
+
+
+def binary_trace_size(count):
+    """Size in bytes of a binary trace holding count events."""
+    return BINARY_HEADER.size + 8 * count + (count + 7) // 8
+
+
+def read_binary_header(trace_file, filename):
+    """Return (page offset, event count) from an open binary trace.
+
+    Raises ValueError if the header is not a known version or the file is
+    not exactly as long as its event count says (a truncated copy, say).
+    """
+    header = trace_file.read(BINARY_HEADER.size)
+    if len(header) < BINARY_HEADER.size:
+        raise ValueError(f"'{filename}' is not a version {BINARY_VERSION} binary trace")
+    magic, version, file_offset, _, count = BINARY_HEADER.unpack(header)
+    if magic != BINARY_MAGIC or version != BINARY_VERSION:
+        raise ValueError(f"'{filename}' is not a version {BINARY_VERSION} binary trace")
+    size = os.fstat(trace_file.fileno()).st_size
+    if size != binary_trace_size(count):
+        raise ValueError(f"'{filename}' should hold {count} events in {binary_trace_size(count)} "
+                         f"bytes but is {size} bytes long")
+    return file_offset, count
+
+
+def iter_binary_blocks(filename, page_offset=PAGE_OFFSET, block_events=BLOCK_SIZE // 8):
+    """Yield (pages, writes) blocks of a binary trace without copying pages.
+
+    pages are memoryview slices of the memory mapped file.
+    """
+    with open(filename, 'rb') as trace_file:
+        file_offset, count = read_binary_header(trace_file, filename)
+        if file_offset != page_offset:
+            raise ValueError(f"'{filename}' was converted with page offset {file_offset}")
+        if count == 0:
+            return
+        mapped = mmap.mmap(trace_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    pages_start = BINARY_HEADER.size
+    bitmap_start = pages_start + 8 * count
+    view = memoryview(mapped)
+    pages = view[pages_start:bitmap_start].cast('q')
+    bitmap = view[bitmap_start:]
+    block_events -= block_events % 8
+    released = 0    # file pages before this offset were dropped from memory
+    try:
+        for start in range(0, count, block_events):
+            end = min(start + block_events, count)
+            block_pages = pages[start:end]
+            if sys.byteorder != 'little':
+                block_pages = array('q', block_pages)
+                block_pages.byteswap()
+            writes = unpack_writes(bitmap[start // 8:(end + 7) // 8])
+            yield block_pages, writes[:end - start]
+
+            # the block is done: let the kernel drop its file pages so the
+            # resident size does not grow with the trace
+            done = (pages_start + 8 * end) // mmap.PAGESIZE * mmap.PAGESIZE
+            if done > released and hasattr(mapped, 'madvise'):
+                mapped.madvise(mmap.MADV_DONTNEED, released, done - released)
+                released = done
+    finally:
+        del pages, bitmap, view
+        try:
+            mapped.close()
+        except BufferError:
+            # a caller still holds a page slice; the map closes with it
+            pass
+
+
+def iter_trace_blocks(filename, page_offset=PAGE_OFFSET, block_size=BLOCK_SIZE):
+    """Yield (pages, writes) for consecutive blocks of a trace file."""
+    if is_binary_trace(filename):
+        yield from iter_binary_blocks(filename, page_offset)
+        return
+
+    with open_trace(filename) as trace_file:
+        first_line = 1
+        rest = b''
+        while True:
+            chunk = trace_file.read(block_size)
+            if not chunk:
+                break
+            data = rest + chunk
+            cut = data.rfind(b'\n') + 1
+            rest = data[cut:]
+            if cut:
+                data = data[:cut]
+                yield decode_block(data, first_line, page_offset)
+                first_line += data.count(b'\n')
+        if rest:
+            yield decode_block(rest, first_line, page_offset)
+
+
+def read_trace(filename, page_offset=PAGE_OFFSET):
+    """Yield (page_number, is_write) for every event in a trace file.
+
+    Raises ValueError("Badly formatted file. Error on line N") on a line
+    that is not an address followed by R or W.
+    """
+    for pages, writes in iter_trace_blocks(filename, page_offset):
+        yield from zip(pages, writes)
+
+
+# -------------------------------------------------
+# CLI Entry: convert a text trace to the binary format
+# -------------------------------------------------
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python3 tracefile.py <text_trace> <binary_trace>")
+        sys.exit(1)
+
+    try:
+        events = convert_to_binary(sys.argv[1], sys.argv[2])
+    except FileNotFoundError:
+        print(f"Input '{sys.argv[1]}' could not be found")
+        sys.exit(1)
+    except ValueError as err:
+        print(err)
+        sys.exit(1)
+
+    print(f"events in trace: {events}")
@@ -0,0 +1,123 @@
+import bz2
+import gzip
+import lzma
+import os
+import tempfile
+import unittest
+from tracefile import PAGE_OFFSET, PageInterner, collapse_runs, convert_to_binary, is_binary_trace, iter_trace_blocks, read_trace
+
+
+def parse_lines(filename):
+    # the line by line parsing memsim used to do
+    events = []
+    with open(filename, 'r') as trace_file:
+        for trace_line in trace_file:
+            trace_cmd = trace_line.strip().split(" ")
+            events.append((int(trace_cmd[0], 16) >> PAGE_OFFSET, trace_cmd[1] == "W"))
+    return events
+
+
+class TestTraceFile(unittest.TestCase):
+    def write_trace(self, contents):
+        fd, path = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as f:
+            f.write(contents)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def decode(self, filename, block_size):
+        events = []
+        for pages, writes in iter_trace_blocks(filename, block_size=block_size):
+            events.extend((page, bool(write)) for page, write in zip(pages, writes))
+        return events
+
+    def test_same_pages_as_line_parsing(self):
+        for trace in ("trace1", "trace2", "trace3", "sample.trace"):
+            expected = parse_lines(trace)
+            for block_size in (7, 64, 1 << 20):
+                self.assertEqual(self.decode(trace, block_size), expected)
+
+    def test_variable_width_addresses(self):
+        path = self.write_trace(b"1000 R\n2fff W\n0 R\n123456789 W")
+        self.assertEqual(list(read_trace(path)),
+                         [(1, 0), (2, 1), (0, 0), (0x123456, 1)])
+
+    def test_collapse_runs(self):
+        pages, counts, any_write = collapse_runs([5, 5, 5, 2, 5, 5, 7],
+                                                 b"\x00\x01\x00\x00\x00\x00\x01")
+        self.assertEqual(list(pages), [5, 2, 5, 7])
+        self.assertEqual(list(counts), [3, 1, 2, 1])
+        self.assertEqual(list(any_write), [1, 0, 0, 1])
+
+    def test_page_interner(self):
+        interner = PageInterner()
+        self.assertEqual(interner.intern([9, 4, 9, 4, 7]), [0, 1, 0, 1, 2])
+        # ids are kept across blocks
+        self.assertEqual(interner.intern([7, 12, 4]), [2, 3, 1])
+        self.assertEqual(len(interner), 4)
+        self.assertEqual([interner.page_of(i) for i in range(4)], [9, 4, 7, 12])
+
+    def test_bad_line_number(self):
+        cases = [b"00001000 R\n00002000 X\n00003000 R\n",
+                 b"00001000 R\n0000g000 W\n00003000 R\n",
+                 b"1000 R\n\n3000 R\n",
+                 b"1000 R\n2000\n3000 W\n"]
+        for contents in cases:
+            path = self.write_trace(contents)
+            for block_size in (5, 1 << 20):
+                with self.assertRaisesRegex(ValueError, "Badly formatted file. Error on line 2$"):
+                    self.decode(path, block_size)
+
+    def test_lines_the_original_parser_accepts(self):
+        # trailing spaces and extra fields were accepted line by line
+        cases = [b"0001f000 R\n0002f000 W \n0003f000 R\n",
+                 b"0001f000 R\n0002f000 W extra\n0003f000 R",
+                 b"  0001f000 R\n0002f000 W\t\n0003f000 R\n"]
+        for contents in cases:
+            path = self.write_trace(contents)
+            for block_size in (5, 1 << 20):
+                self.assertEqual(self.decode(path, block_size),
+                                 [(0x1f, False), (0x2f, True), (0x3f, False)])
+        path = self.write_trace(b"0001f000 R\n0002f000 W \n0003f000  R\n")
+        with self.assertRaisesRegex(ValueError, "Badly formatted file. Error on line 3$"):
+            self.decode(path, 1 << 20)
+        # a tab on one line must not make up for a doubled space on another;
+        # the original parser stopped at the tab
+        path = self.write_trace(b"0001f000 R\n0002f000\tW\n0003f000  R\n")
+        with self.assertRaisesRegex(ValueError, "Badly formatted file. Error on line 2$"):
+            self.decode(path, 1 << 20)
+
+    def test_binary_round_trip(self):
+        for trace in ("trace1", "trace2", "trace3", "sample.trace"):
+            path = self.write_trace(b"")
+            events = convert_to_binary(trace, path)
+            self.assertTrue(is_binary_trace(path))
+            self.assertFalse(is_binary_trace(trace))
+            self.assertEqual(events, len(parse_lines(trace)))
+            self.assertEqual([(page, bool(write)) for page, write in read_trace(path)],
+                             parse_lines(trace))
+
+    def test_truncated_binary_trace(self):
+        path = self.write_trace(b"")
+        convert_to_binary("trace3", path)
+        with open(path, 'rb') as f:
+            contents = f.read()
+        # cut inside the pages, inside the bitmap, and inside the header
+        for size in (len(contents) - 30, len(contents) - 1, 10):
+            truncated = self.write_trace(contents[:size])
+            with self.assertRaisesRegex(ValueError, "bytes long|binary trace"):
+                list(iter_trace_blocks(truncated))
+        longer = self.write_trace(contents + b"\0")
+        with self.assertRaisesRegex(ValueError, "bytes long"):
+            list(iter_trace_blocks(longer))
+
+    def test_compressed_traces(self):
+        with open("trace3", 'rb') as f:
+            contents = f.read()
+        for compress in (gzip.compress, bz2.compress, lzma.compress):
+            path = self.write_trace(compress(contents))
+            self.assertEqual(self.decode(path, 1 << 20), parse_lines("trace3"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+from mmu import MMU, NO_PAGE
+from array import array
+from framepool import FreeFramePool
+from collections import OrderedDict
+
+"""Two-list replacement in the style of the Linux kernel's active and
+inactive LRU lists, memsim mode active-inactive. It is related to 2Q but
+has no A1in FIFO and no A1out ghost queue:
+    - a faulted-in page goes to the most recently used end of the inactive list
+    - a hit on an inactive page (its second reference) promotes it to the
+      active list
+    - a hit on an active page moves it to the most recently used end
+    - before an eviction, refill demotes the least recently used active
+      pages to the inactive list while the active list is more than
+      inactive_ratio times larger than the inactive list
+    - the victim is the least recently used inactive page
+Pages used only once therefore never reach the active list. Both lists are
+OrderedDicts (least recently used first), so every step is O(1).
+"""
+class TwoListMMU(MMU):
+    __slots__ = ("frames", "debug", "frame_table", "free_frames", "table", "dirty_pages",
+                 "active", "inactive", "inactive_ratio", "promotions", "demotions",
+                 "page_faults", "disk_reads", "disk_writes", "disk_accesses")
+
+    def __init__(self, frames, debug=False, inactive_ratio=1):
+        self.frames = frames
+        self.debug = debug
+
+        # frame -> page mapping
+        self.frame_table = array('q', [NO_PAGE]) * frames
+        self.free_frames = FreeFramePool(frames)
+
+        # page -> frame mapping
+        self.table = {}
+
+        # set of pages currently marked dirty
+        self.dirty_pages = set()
+
+        # active and inactive lists, least recently used first
+        self.active = OrderedDict()
+        self.inactive = OrderedDict()
+        self.inactive_ratio = inactive_ratio
+
+        # stats
+        self.promotions = 0     # inactive -> active
+        self.demotions = 0      # active -> inactive
+        self.page_faults = 0
+        self.disk_reads = 0
+        self.disk_writes = 0
+        self.disk_accesses = 0
+
+    def set_debug(self):
+        self.debug = True
+
+    def reset_debug(self):
+        self.debug = False
+
+    def get_frame(self, page_number):
+        return self.table.get(page_number)
+
+    def _refill(self):
+        """Demote active pages until the inactive list is large enough."""
+        active = self.active
+        inactive = self.inactive
+        while active and (not inactive or len(active) > len(inactive) * self.inactive_ratio):
+            page_number, _ = active.popitem(last=False)
+            inactive[page_number] = None
+            self.demotions += 1
+
+    def _allocate_frame_for(self, page_number):
+        frame = self.free_frames.allocate()
+        if frame is not None:
+            return frame
+
+        # No free frame: evict the least recently used inactive page
+        self._refill()
+        victim_page, _ = self.inactive.popitem(last=False)
+        victim_frame = self.table.pop(victim_page)
+
+        if self.debug:
+            print(f"Evicting page {victim_page} from frame {victim_frame}")
+
+        # Write back if dirty
+        if victim_page in self.dirty_pages:
+            self.disk_writes += 1
+            self.dirty_pages.remove(victim_page)
+            if self.debug:
+                print(f"Writing dirty page {victim_page} to disk (disk_writes={self.disk_writes})")
+
+        self.frame_table[victim_frame] = NO_PAGE
+        return victim_frame
+
+    def _access(self, page_number):
+        """Update the lists for one access. Returns True on a page fault."""
+        if page_number in self.active:
+            self.active.move_to_end(page_number)
+            return False
+        if page_number in self.inactive:
+            del self.inactive[page_number]
+            self.active[page_number] = None
+            self.promotions += 1
+            return False
+
+        # PAGE FAULT
+        self.page_faults += 1
+        self.disk_reads += 1
+        frame = self._allocate_frame_for(page_number)
+        self.inactive[page_number] = None
+        self.frame_table[frame] = page_number
+        self.table[page_number] = frame
+        return True
+
+    def read_memory(self, page_number):
+        fault = self._access(page_number)
+        if self.debug:
+            if fault:
+                print(f"Read miss: loading page {page_number} into frame {self.table[page_number]} (disk_reads={self.disk_reads})")
+            else:
+                print(f"Read hit: page {page_number} in frame {self.table[page_number]}")
+            print("="*50 + "\n")
+        return fault
+
+    def write_memory(self, page_number):
+        fault = self._access(page_number)
+        self.dirty_pages.add(page_number)
+        if self.debug:
+            if fault:
+                print(f"Write miss: loading page {page_number} into frame {self.table[page_number]} (disk_reads={self.disk_reads})")
+            else:
+                print(f"Write hit: marked page {page_number} dirty in frame {self.table[page_number]}")
+            print("="*50 + "\n")
+        return fault
+
+    def get_total_disk_reads(self):
+        return self.disk_reads
+
+    def get_total_disk_writes(self):
+        return self.disk_writes
+
+    def get_total_page_faults(self):
+        return self.page_faults
+
+    def get_disk_accesses(self):
+        return self.disk_accesses
+
+    def get_report(self):
+        return [f"active pages: {len(self.active)}, inactive pages: {len(self.inactive)}",
+                f"promotions: {self.promotions}, demotions: {self.demotions}"]
+
+    def print_page_table(self):
+        if not self.debug:
+            return
+        table = ['-'] * self.frames
+        for i, page in enumerate(self.frame_table):
+            if page != NO_PAGE:
+                table[i] = str(page)
+        print("Page Table:", " ".join(table))
+        print("-" * 40)
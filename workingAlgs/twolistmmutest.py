@@ -0,0 +1,57 @@
+import unittest
+from twolistmmu import TwoListMMU
+
+
+class TestTwoListMMU(unittest.TestCase):
+    def test_second_reference_promotes(self):
+        mmu = TwoListMMU(4)
+        mmu.read_memory(1)
+        mmu.read_memory(2)
+        self.assertEqual(list(mmu.inactive), [1, 2])
+        self.assertEqual(list(mmu.active), [])
+        mmu.read_memory(1)
+        self.assertEqual(list(mmu.inactive), [2])
+        self.assertEqual(list(mmu.active), [1])
+        # further hits only move the page within the active list
+        mmu.read_memory(1)
+        self.assertEqual(mmu.promotions, 1)
+        self.assertEqual(mmu.get_total_page_faults(), 2)
+
+    def test_refill_demotes_to_inactive_ratio(self):
+        mmu = TwoListMMU(4, inactive_ratio=1)
+        for page in (1, 2, 3, 4, 1, 2, 3):
+            mmu.read_memory(page)
+        self.assertEqual(list(mmu.active), [1, 2, 3])
+        self.assertEqual(list(mmu.inactive), [4])
+        # the fault on 5 demotes 1 (then active 2 <= inactive 2) and
+        # evicts the least recently used inactive page, 4
+        mmu.read_memory(5)
+        self.assertEqual(mmu.demotions, 1)
+        self.assertEqual(list(mmu.active), [2, 3])
+        self.assertEqual(list(mmu.inactive), [1, 5])
+        self.assertNotIn(4, mmu.table)
+
+        # a larger ratio lets the active list stay bigger
+        mmu = TwoListMMU(4, inactive_ratio=3)
+        for page in (1, 2, 3, 4, 1, 2, 3, 5):
+            mmu.read_memory(page)
+        self.assertEqual(mmu.demotions, 0)
+        self.assertEqual(list(mmu.active), [1, 2, 3])
+        self.assertEqual(list(mmu.inactive), [5])
+
+    def test_counts_and_write_backs(self):
+        mmu = TwoListMMU(2)
+        mmu.write_memory(1)
+        for page in (1, 2, 2):
+            mmu.read_memory(page)
+        mmu.read_memory(3)      # the inactive list is empty: demotes 1, evicts dirty 1
+        mmu.read_memory(4)      # evicts clean 3
+        self.assertEqual(mmu.get_total_page_faults(), 4)
+        self.assertEqual(mmu.get_total_disk_reads(), 4)
+        self.assertEqual(mmu.get_total_disk_writes(), 1)
+        self.assertEqual(mmu.get_report(), ["active pages: 1, inactive pages: 1",
+                                            "promotions: 2, demotions: 1"])
+
+
+if __name__ == '__main__':
+    unittest.main()
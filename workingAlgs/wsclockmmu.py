@@ -0,0 +1,201 @@
+from clockmmu import ClockMMU
+from mmu import MAX_SAMPLES, MMU, NO_PAGE, thin_samples
+from array import array
+from collections import deque
+
+"""WSClock: clock replacement driven by the working set.
+Each frame remembers the virtual time (access count) of its last use. A
+page is in the working set while now - last use <= tau. On a fault the
+hand sweeps the frames as in ClockMMU:
+    use bit 1                  -> clear it, page was just used
+    outside the working set:
+        clean                  -> evict it
+        dirty                  -> schedule a write back and move on
+    inside the working set     -> move on
+The hand looks at no more than max_scan frames (or two laps of a smaller
+memory) per fault, so a fault costs O(max_scan) and an access O(1)
+amortized whatever the frame count. If
+none of them was a clean page outside the working set, the oldest page
+whose write back was just scheduled is evicted; if there was none either,
+every page seen is in the working set and the oldest clean one (or the
+oldest one if all are dirty) is evicted, counted in forced_evictions.
+The default tau is half the number of frames. With a tau of `frames` or
+more, a page must sit unused for at least as many accesses as there are
+frames before it leaves the working set; on fault heavy traces pages are
+evicted sooner than that, so nearly every fault was a forced eviction.
+
+The working set size is kept up to date as pages are used: uses_in_window
+holds the frame of each of the last tau + 1 accesses, and a page leaves
+the count when the access that last used it drops out of that window or
+when the page is evicted.
+"""
+class WSClockMMU(ClockMMU):
+    MAX_SCAN = 64   # frames the hand looks at per fault
+
+    __slots__ = ("tau", "max_scan", "access_counter", "last_use_time", "ws_size",
+                 "uses_in_window", "sample_interval", "ws_history",
+                 "scheduled_writes", "forced_evictions")
+
+    def __init__(self, frames, debug=False, tau=None, sample_interval=1000, interner=None,
+                 max_scan=MAX_SCAN):
+        super().__init__(frames, debug, interner)
+        self.tau = tau if tau is not None else max(1, frames // 2)
+        # a small memory gets two laps: the first may only clear use bits
+        self.max_scan = min(max_scan, 2 * frames)
+        self.access_counter = 0                     # virtual time
+        self.last_use_time = array('q', [0]) * frames
+
+        # resident pages in the working set, and the frames used by the
+        # accesses in the window, oldest first
+        self.ws_size = 0
+        self.uses_in_window = deque()
+
+        # working set size sampled as (access, size); the interval doubles
+        # whenever MAX_SAMPLES samples have been taken
+        self.sample_interval = sample_interval
+        self.ws_history = []
+
+        self.scheduled_writes = 0   # write backs started by the sweep
+        self.forced_evictions = 0   # no page seen was outside the working set
+
+    def _evict_frame(self, frame):
+        occupant = self.frame_table[frame]
+        if self.debug:
+            print(f"Evicting page {self.page_label(occupant)} from frame {frame}")
+
+        # A dirty page only gets here when nothing else could be evicted
+        if self.dirty_bits[frame]:
+            self.disk_writes += 1
+            self.dirty_bits[frame] = 0
+            if self.debug:
+                print(f"Writing dirty page {self.page_label(occupant)} to disk (disk_writes={self.disk_writes})")
+
+        if self.access_counter - self.last_use_time[frame] <= self.tau:
+            self.ws_size -= 1
+        del self.table[occupant]
+        self.frame_table[frame] = NO_PAGE
+        self.use_bits[frame] = 0
+        return frame
+
+    def _allocate_frame_for(self, page_number):
+        # 1. Check for a free frame first
+        frame = self.free_frames.allocate()
+        if frame is not None:
+            self.use_bits[frame] = 1   # first access sets use bit
+            return frame
+
+        # 2. No free frame: look at up to max_scan frames for a page
+        # outside the working set
+        now = self.access_counter
+        tau = self.tau
+        frames = self.frames
+        use_bits = self.use_bits
+        dirty_bits = self.dirty_bits
+        last_use_time = self.last_use_time
+        hand = self.clock_hand
+        oldest_clean = None
+        oldest = None
+        oldest_scheduled = None
+        for _ in range(self.max_scan):
+            frame = hand
+            hand += 1
+            if hand == frames:
+                hand = 0
+
+            if use_bits[frame]:
+                use_bits[frame] = 0
+                continue
+
+            last_use = last_use_time[frame]
+            if now - last_use > tau:
+                if not dirty_bits[frame]:
+                    self.clock_hand = hand
+                    return self._evict_frame(frame)
+                # schedule the write back instead of waiting for it
+                self.disk_writes += 1
+                dirty_bits[frame] = 0
+                self.scheduled_writes += 1
+                if self.debug:
+                    print(f"Scheduling write back of page {self.page_label(self.frame_table[frame])} "
+                          f"(disk_writes={self.disk_writes})")
+                if oldest_scheduled is None or last_use < last_use_time[oldest_scheduled]:
+                    oldest_scheduled = frame
+                continue
+
+            if oldest is None or last_use < last_use_time[oldest]:
+                oldest = frame
+            if not dirty_bits[frame] and (oldest_clean is None or
+                                          last_use < last_use_time[oldest_clean]):
+                oldest_clean = frame
+        self.clock_hand = hand
+
+        # 3. A page whose write back was scheduled is clean now
+        if oldest_scheduled is not None:
+            return self._evict_frame(oldest_scheduled)
+
+        # 4. Every page seen is in the working set
+        self.forced_evictions += 1
+        if oldest_clean is not None:
+            return self._evict_frame(oldest_clean)
+        if oldest is not None:
+            return self._evict_frame(oldest)
+        # every page seen had its use bit set
+        return self._evict_frame(self.clock_hand)
+
+    def _tick(self):
+        """Advance virtual time by one access."""
+        now = self.access_counter = self.access_counter + 1
+        # the access tau + 1 accesses ago leaves the window; its page leaves
+        # the working set if that was its last use
+        time = now - self.tau - 1
+        if time >= 1:
+            frame = self.uses_in_window.popleft()
+            if self.last_use_time[frame] == time and self.frame_table[frame] != NO_PAGE:
+                self.ws_size -= 1
+
+    def _record_use(self, page_number, fault):
+        now = self.access_counter
+        frame = self.table[page_number]
+        last_use_time = self.last_use_time
+        if fault or now - last_use_time[frame] > self.tau:
+            self.ws_size += 1   # the page (re)enters the working set
+        last_use_time[frame] = now
+        self.uses_in_window.append(frame)
+        if now % self.sample_interval == 0:
+            self.ws_history.append((now, self.ws_size))
+            if len(self.ws_history) == MAX_SAMPLES:
+                self.ws_history, self.sample_interval = thin_samples(self.ws_history,
+                                                                     self.sample_interval)
+
+    def working_set_size(self):
+        """Number of resident pages used within the last tau accesses."""
+        return self.ws_size
+
+    def read_memory(self, page_number):
+        self._tick()
+        fault = super().read_memory(page_number)
+        self._record_use(page_number, fault)
+        return fault
+
+    def write_memory(self, page_number):
+        self._tick()
+        fault = super().write_memory(page_number)
+        self._record_use(page_number, fault)
+        return fault
+
+    def access_batch(self, pages, is_write, fault_bitmap=None):
+        # the ClockMMU fast path would skip _record_use
+        return MMU.access_batch(self, pages, is_write, fault_bitmap)
+
+    def access_runs(self, pages, counts, any_write):
+        # every access of a run moves the page's last use time
+        return MMU.access_runs(self, pages, counts, any_write)
+
+    def get_report(self):
+        lines = [f"wsclock tau: {self.tau}, working set size: {self.working_set_size()}",
+                 f"wsclock scheduled write backs: {self.scheduled_writes}, "
+                 f"forced evictions: {self.forced_evictions}"]
+        if self.ws_history:
+            samples = " ".join(f"{access}:{size}" for access, size in self.ws_history)
+            lines.append(f"wsclock working set every {self.sample_interval} accesses: {samples}")
+        return lines
@@ -0,0 +1,81 @@
+import random
+import unittest
+from mmu import MAX_SAMPLES, NO_PAGE
+from policies import create_mmu
+from tracefile import PageInterner
+from wsclockmmu import WSClockMMU
+
+
+def brute_force_ws_size(mmu):
+    now = mmu.access_counter
+    return sum(1 for frame, page in enumerate(mmu.frame_table)
+               if page != NO_PAGE and now - mmu.last_use_time[frame] <= mmu.tau)
+
+
+class TestWSClockMMU(unittest.TestCase):
+    def test_evicts_idle_clean_page(self):
+        mmu = WSClockMMU(3, tau=2)
+        for page in (1, 2, 3, 2, 3, 2, 3):
+            mmu.read_memory(page)
+        # 1 has been idle for 6 accesses; 2 and 3 are in the working set
+        mmu.read_memory(4)
+        self.assertNotIn(1, mmu.table)
+        self.assertEqual(mmu.forced_evictions, 0)
+        self.assertEqual(mmu.get_total_disk_writes(), 0)
+
+    def test_schedules_write_back_of_idle_dirty_page(self):
+        mmu = WSClockMMU(3, tau=2)
+        mmu.write_memory(1)
+        for page in (2, 3, 2, 3, 2, 3):
+            mmu.read_memory(page)
+        mmu.read_memory(4)
+        # 1 was the only page outside the working set: its write back is
+        # scheduled rather than waited for, and then it is evicted clean
+        self.assertEqual(mmu.scheduled_writes, 1)
+        self.assertEqual(mmu.get_total_disk_writes(), 1)
+        self.assertNotIn(1, mmu.table)
+        self.assertEqual(mmu.forced_evictions, 0)
+
+    def test_forced_eviction_when_all_pages_in_working_set(self):
+        mmu = WSClockMMU(3, tau=100)
+        for page in (1, 2, 3):
+            mmu.read_memory(page)
+        mmu.write_memory(2)
+        mmu.read_memory(4)
+        self.assertEqual(mmu.forced_evictions, 1)
+        # the oldest clean page goes, and the dirty page is kept
+        self.assertNotIn(1, mmu.table)
+        self.assertIn(2, mmu.table)
+        self.assertEqual(mmu.get_total_disk_writes(), 0)
+
+    def test_sweep_is_capped(self):
+        mmu = WSClockMMU(1000, tau=10 ** 6, max_scan=8)
+        for page in range(1000):
+            mmu.read_memory(page)
+        mmu.read_memory(5000)
+        # the hand stopped after max_scan frames
+        self.assertEqual(mmu.clock_hand, 8)
+        self.assertEqual(mmu.forced_evictions, 1)
+
+    def test_working_set_size_kept_up_to_date(self):
+        rng = random.Random(3)
+        for frames, tau in ((3, None), (8, 5), (16, 100)):
+            mmu = WSClockMMU(frames, tau=tau, sample_interval=10)
+            for _ in range(5000):
+                page = rng.randrange(40) if rng.random() < 0.7 else rng.randrange(4)
+                if rng.random() < 0.3:
+                    mmu.write_memory(page)
+                else:
+                    mmu.read_memory(page)
+                self.assertEqual(mmu.working_set_size(), brute_force_ws_size(mmu))
+            self.assertLess(len(mmu.ws_history), MAX_SAMPLES)
+            self.assertEqual(mmu.ws_history[-1][0] % mmu.sample_interval, 0)
+
+    def test_tau_from_create_mmu(self):
+        self.assertEqual(create_mmu("wsclock", 8).tau, 4)
+        self.assertEqual(create_mmu("wsclock", 8, wsclock_tau=20).tau, 20)
+        self.assertEqual(create_mmu("wsclock", 8, interner=PageInterner(), wsclock_tau=3).tau, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()